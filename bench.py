@@ -0,0 +1,280 @@
+# bench.py
+"""Benchmarks for the engine's hot paths, checked against a stored baseline.
+
+    python bench.py                    # run all, compare with bench_baseline.json
+    python bench.py --only shuffle round_7p --quick
+    python bench.py --save             # store this run as the new baseline
+    python bench.py --json results.json
+
+Results go to stdout as one JSON object; a readable table goes to stderr.
+Each benchmark reports one figure, the best of ``--repeat`` runs: ``ns/op``
+(lower is better) or ``hands/s`` (higher is better). The run's peak RSS is
+reported alongside. With a baseline, any figure more than ``--threshold``
+worse than its stored value fails the run (exit status 1), so a slowdown is
+caught before it reaches a long simulation. Baselines are per machine:
+regenerate one with ``--save`` wherever the comparison runs.
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import sys
+from time import perf_counter
+
+from engine import CARDS, DEFAULT_RULES, NUM_DECKS, DrillPool, Hand, Shoe, Table, calc_total, compare_hand, recommend, simulate
+
+BASELINE = "bench_baseline.json"
+THRESHOLD = 0.25  # best-of-5 figures still move 10-20% between runs on a busy machine
+MAX_PLAYERS = 7
+HIGHER_IS_BETTER = {"ns/op": False, "hands/s": True, "bytes": False}
+
+# name -> (unit, fn, n); fn(n) runs n operations and returns (ops, seconds),
+# or (ops, bytes) for a "bytes" figure
+BENCHMARKS = {}
+
+
+def benchmark(name: str, unit: str = "ns/op", n: int = 200_000):
+    def register(fn):
+        BENCHMARKS[name] = (unit, fn, n)
+        return fn
+
+    return register
+
+
+# ---------------------------------------------------------------------------#
+#                                 hand math                                  #
+# ---------------------------------------------------------------------------#
+@benchmark("calc_total")
+def bench_calc_total(n):
+    """Totals of 2-4 card hands given as card names (the list form)."""
+    hands = [[CARDS[(i * 7 + j * 13) % 52] for j in range(2 + i % 3)] for i in range(1024)]
+    t = perf_counter()
+    for i in range(n):
+        calc_total(hands[i & 1023])
+    return n, perf_counter() - t
+
+
+@benchmark("compare_hand")
+def bench_compare_hand(n):
+    """Settling a finished player hand against a finished dealer hand."""
+    shoe = Shoe(NUM_DECKS, seed=1)
+    pairs = []
+    while len(pairs) < 1024:
+        if shoe.curr + 12 > len(shoe):
+            shoe.shuffle()
+        player, dealer = shoe.draw_card(Hand(), 2), shoe.draw_card(Hand(), 2)
+        while dealer.total < 17:
+            shoe.draw_card(dealer)
+        pairs.append((player, dealer))
+    t = perf_counter()
+    for i in range(n):
+        player, dealer = pairs[i & 1023]
+        compare_hand(player, dealer)
+    return n, perf_counter() - t
+
+
+# ---------------------------------------------------------------------------#
+#                                    shoe                                    #
+# ---------------------------------------------------------------------------#
+@benchmark("draw_card")
+def bench_draw_card(n):
+    """One card, counted, into a fresh hand of four."""
+    shoe = Shoe(NUM_DECKS, seed=1)
+    shoe.shuffle()
+    last = len(shoe) - 4
+    t = perf_counter()
+    for _ in range(n // 4):
+        if shoe.curr > last:
+            shoe.curr = 0
+        shoe.draw_card(Hand(), 4)
+    return n // 4 * 4, perf_counter() - t
+
+
+@benchmark("shuffle", n=2_000)
+def bench_shuffle(n):
+    shoe = Shoe(NUM_DECKS, seed=1)
+    t = perf_counter()
+    for _ in range(n):
+        shoe.shuffle()
+    return n, perf_counter() - t
+
+
+@benchmark("dealer_play", n=100_000)
+def bench_dealer_play(n):
+    """The dealer drawing out from two cards, as ``Round.play_dealer`` does."""
+    shoe = Shoe(NUM_DECKS, seed=1)
+    hits = DEFAULT_RULES.config.dealer_hits
+    t = perf_counter()
+    for _ in range(n):
+        if shoe.curr + 12 > len(shoe):
+            shoe.curr = 0
+        dealer = shoe.draw_card(Hand(), 2)
+        while hits[dealer.soft > 0][dealer.total]:
+            shoe.draw_card(dealer)
+    return n, perf_counter() - t
+
+
+# ---------------------------------------------------------------------------#
+#                                 throughput                                 #
+# ---------------------------------------------------------------------------#
+def bench_rounds(num_players: int, n: int):
+    """Whole rounds, basic strategy (splits included); counts settled hands."""
+    table = Table(num_players, shoe=Shoe(NUM_DECKS, seed=1), starting_chips=1 << 40)
+    hands = 0
+    t = perf_counter()
+    while hands < n:
+        rnd = table.new_round()
+        while rnd.active:
+            action = recommend(rnd.current, rnd.dealer[0], table.rules, rnd.options())
+            rnd.act(action)
+        rnd.finish()
+        hands += len(rnd.arena)
+    return hands, perf_counter() - t
+
+
+for _p in range(1, MAX_PLAYERS + 1):
+    benchmark(f"round_{_p}p", "hands/s", 20_000)(lambda n, p=_p: bench_rounds(p, n))
+
+
+@benchmark("simulate", "hands/s", 100_000)
+def bench_simulate(n):
+    simulate(n_hands=1_000, seed=0)  # build the strategy and its cache first
+    t = perf_counter()
+    simulate(n_hands=n, seed=1)
+    return n, perf_counter() - t
+
+
+@benchmark("drill", n=100_000)
+def bench_drill(n):
+    """Serving one drill from a ``DrillPool`` and grading an answer."""
+    pool = DrillPool(seed=1)
+    t = perf_counter()
+    for _ in range(n):
+        pool.grade(next(pool), "stand")
+    return n, perf_counter() - t
+
+
+# ---------------------------------------------------------------------------#
+#                                   memory                                   #
+# ---------------------------------------------------------------------------#
+@benchmark("table_bytes", "bytes", 2_000)
+def bench_table_bytes(n):
+    """Memory per hosted 2-player table with a round in progress; also
+    checked against ``tableserver.TABLE_BYTES`` on every run."""
+    from tableserver import table_bytes
+
+    return 1, table_bytes(n)
+
+
+# ---------------------------------------------------------------------------#
+#                                    GUI                                     #
+# ---------------------------------------------------------------------------#
+@benchmark("gui_frame", n=2_000)
+def bench_gui_frame(n):
+    """A whole GUI frame mid-round, ``draw_game`` then ``render``, on SDL's
+    dummy video driver. Each frame is a full repaint, since ``render`` skips
+    the blits for an unchanged table."""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import blackjack  # needs pygame; opens the (dummy) window
+
+    blackjack.table = Table(blackjack.NUM_PLAYERS, shoe=Shoe(NUM_DECKS, seed=1))
+    while True:
+        blackjack.deal()
+        if blackjack.phase is blackjack.Phase.PLAYING:
+            break
+    blackjack.draw_game()  # fill the surface caches
+    t = perf_counter()
+    for _ in range(n):
+        blackjack.shown = set()  # nothing on screen: repaint everything
+        blackjack.render(blackjack.draw_game()[1])
+    return n, perf_counter() - t
+
+
+# ---------------------------------------------------------------------------#
+#                                   runner                                   #
+# ---------------------------------------------------------------------------#
+def run(names, repeat: int, scale: float) -> dict:
+    results = {}
+    for name in names:
+        unit, fn, n = BENCHMARKS[name]
+        n = max(int(n * scale), 4)
+        try:
+            best = min(s / ops for ops, s in (fn(n) for _ in range(repeat)))
+        except ImportError as e:  # e.g. pygame missing: skip the GUI figure
+            print(f"{name:16} skipped ({e})", file=sys.stderr)
+            continue
+        value = {"hands/s": 1 / best, "ns/op": best * 1e9, "bytes": best}[unit]
+        results[name] = {"value": round(value, 1), "unit": unit}
+        print(f"{name:16} {value:14,.1f} {unit}", file=sys.stderr)
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """Every figure more than ``threshold`` worse than the baseline."""
+    regressions = []
+    for name, now in results.items():
+        then = baseline.get(name)
+        if then is None or then["unit"] != now["unit"]:
+            continue
+        change = now["value"] / then["value"] - 1
+        worse = -change if HIGHER_IS_BETTER[now["unit"]] else change
+        if worse > threshold:
+            regressions.append(f"{name}: {then['value']:,} -> {now['value']:,} {now['unit']} ({worse:+.0%} worse)")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Engine benchmarks with regression tracking.")
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), metavar="NAME", help="run just these benchmarks")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per benchmark; the best counts (default 5)")
+    parser.add_argument("--quick", action="store_true", help="a tenth of the work, for a smoke run")
+    parser.add_argument("--baseline", default=BASELINE, help=f"baseline file (default {BASELINE})")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help=f"allowed slowdown (default {THRESHOLD})")
+    parser.add_argument("--save", action="store_true", help="write the results to the baseline file")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args(argv)
+
+    results = run(args.only or list(BENCHMARKS), args.repeat, 0.1 if args.quick else 1.0)
+    report = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "results": results,
+    }
+    print(f"{'peak RSS':16} {report['peak_rss_kb']:14,} kB", file=sys.stderr)
+    print(json.dumps(report))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+    failed = False
+    if "table_bytes" in results:
+        from tableserver import TABLE_BYTES
+
+        if results["table_bytes"]["value"] > TABLE_BYTES:
+            print(f"OVER BUDGET table_bytes: {results['table_bytes']['value']:,} > {TABLE_BYTES:,}", file=sys.stderr)
+            failed = True
+
+    if args.save:
+        saved = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                saved = json.load(f)["results"]
+        report["results"] = {**saved, **results}
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        return int(failed)
+    if not os.path.exists(args.baseline):
+        print(f"no baseline at {args.baseline}; run with --save to create one", file=sys.stderr)
+        return int(failed)
+    with open(args.baseline) as f:
+        regressions = compare(results, json.load(f)["results"], args.threshold)
+    for line in regressions:
+        print("REGRESSION", line, file=sys.stderr)
+    return 1 if regressions or failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,15 +1,28 @@
 # blackjack.py
-import copy
-import random
+import argparse
+import os
+import sys
+from enum import Enum
+from functools import lru_cache
+from time import perf_counter_ns
+
 import pygame
 
-pygame.init()
+from cardatlas import BACK, CARD_H, CARD_W, CardAtlas
+from engine import MIN_BET, Metrics, Outcome, Round, Rules, Table, recommend
+from engine.arena import STATUSES
+from engine.drills import DrillPool, DrillStats, stats_path
+from engine.strategy import load_table
+
+# only the subsystems the table uses; a full pygame.init() also brings up audio
+pygame.display.init()
+pygame.font.init()
 
 # --- screen / timing --------------------------------------------------------
-WIDTH, HEIGHT, FPS = 450, 600, 60
+WIDTH, HEIGHT = 450, 600
+WAIT_MS = 1000  # longest the loop sleeps in event.wait when nothing happens
 screen = pygame.display.set_mode([WIDTH, HEIGHT])
 pygame.display.set_caption("Blackjack")
-clock = pygame.time.Clock()
 
 # --- fonts ------------------------------------------------------------------
 font = pygame.font.Font("freesansbold.ttf", 25)
@@ -17,317 +30,379 @@ font_underline = pygame.font.Font("freesansbold.ttf", 25)
 font_underline.set_underline(True)
 
 # --- card data --------------------------------------------------------------
-ranks = ["2", "3", "4", "5", "6", "7", "8", "9", "T", "J", "Q", "K", "A"]
-COUNT_VALUES = dict(zip(ranks, [1] * 5 + [0] * 3 + [-1] * 5))
-CARD_VALUES = dict(zip(ranks, [2, 3, 4, 5, 6, 7, 8, 9, 10, 10, 10, 10, 11]))
+atlas = CardAtlas()  # decoded on the first card drawn
+CHIP_SIZE = 60
+
+
+@lru_cache(maxsize=None)
+def chip_image(label: str) -> pygame.Surface:
+    chip = pygame.image.load(f"images/chip{label}.png").convert_alpha()
+    return pygame.transform.scale(chip, (CHIP_SIZE, CHIP_SIZE))
 
-cards = [s + r for r in ranks for s in ("C", "D", "H", "S")]
-card_images = {c: pygame.image.load(f"images/{c}.png").convert() for c in cards}
-face_down = pygame.image.load("images/card_face_down.png")
 
 # --- game constants ---------------------------------------------------------
-MIN_BET, REBUY_AMOUNT = 5, 100
 NUM_PLAYERS = 2
+RULES = Rules()  # e.g. Rules(hit_soft_17=True, blackjack_payout=1.2, surrender=True)
+METRICS_PATH = os.environ.get("BLACKJACK_METRICS")  # set to write Prometheus text on quit
 TOP_OFFSET = [50, 16, 12]  # visual tweak by player-count (don’t touch)
+MIN_CARD_H = 12  # cards stay visible however many split hands share the table
+OUTCOME_TEXT = {
+    Outcome.PUSH: "Push",
+    Outcome.WIN: "Player Win",
+    Outcome.LOSE: "Player Lose",
+    Outcome.BLACKJACK: "Player BJ!",
+    Outcome.BLACKJACK_PUSH: "BJ Push.",
+    Outcome.BUST: "Player Lose",
+    Outcome.DEALER_BUST: "Player Win",
+    Outcome.DEALER_BLACKJACK: "Player Lose",
+    Outcome.SURRENDER: "Surrender",
+}
 
 # --- state containers -------------------------------------------------------
-deck = copy.deepcopy(cards * 2)
-cut, curr, running_count = 0, 0, 0
-flat_hands: list[str] = []
+metrics = Metrics() if METRICS_PATH else None  # engine phases plus "layout" and "render"
+table = Table(NUM_PLAYERS, rules=RULES, metrics=metrics)
+rnd: Round | None = None
 options: list[str] = []
 
-chips = [100 for _ in range(NUM_PLAYERS)]
 bet = MIN_BET
 new_bet = MIN_BET
-is_double_down = [False] * NUM_PLAYERS
-hand_to_player = [i + 1 for i in range(NUM_PLAYERS)]
-hand = [[] for _ in range(NUM_PLAYERS + 1)]  # 0 = dealer
-messages = [""] * (NUM_PLAYERS + 1)
+banner = ""
+
+drill_pool: DrillPool | None = None  # loaded on the first drill
+scenario = None  # the drill on screen
+drill_cards = None  # (player Hand, upcard code) showing ``scenario``
+drill_score = [0, 0]  # correct, answered since drills were opened
 
-# --- round flags ------------------------------------------------------------
+# --- game state -------------------------------------------------------------
+class Phase(Enum):
+    BETWEEN = "between"  # no hand to play: deal / reveal count / change bet
+    BETTING = "betting"  # the bet editor is open
+    PLAYING = "playing"  # rnd.current is waiting for a player action
+    DRILLING = "drilling"  # a drill scenario is waiting for an answer
+
+
+phase = Phase.BETWEEN
 running = True
-active = False
-editing_bet = False
-first_deal = True
-first_finished = False
-turn = 1
+stale = True  # the layout needs recomputing: set by the engine's change feed and by click()
 
 
-# ---------------------------------------------------------------------------#
-#                               helper functions                             #
-# ---------------------------------------------------------------------------#
-def shuffle() -> None:
-    """Reshuffle and cut the shoe."""
-    global cut, deck, curr, running_count, messages
-    cut = random.randrange(len(deck) // 2, len(deck) * 2 // 3)
-    curr = running_count = 0
-    random.shuffle(deck)
-    messages[0] = "Deck Shuffled!"
-
-
-def calc_total(cards_on_table: list[str]) -> int:
-    total = aces = 0
-    for card in cards_on_table:
-        total += CARD_VALUES[card[1]]
-        if card[1] == "A":
-            aces += 1
-    while aces and total > 21:
-        aces -= 1
-        total -= 10
-    return total
-
-
-def draw_card(target_hand: list[str], n: int = 1) -> list[str]:
-    global curr
-    for _ in range(n):
-        target_hand.append(deck[curr])
-        curr += 1
-    return target_hand
-
-
-def is_blackjack(cards_on_table: list[str]) -> bool:
-    return len(cards_on_table) == 2 and calc_total(cards_on_table) == 21
-
-
-def compare_hand(player, dealer, idx) -> str:
-    global bet, chips, is_double_down, hand_to_player
-    player_total, dealer_total = calc_total(player), calc_total(dealer)
-    mult, outcome = 0, ""
-
-    if is_blackjack(player):
-        if is_blackjack(dealer):
-            outcome = "BJ Push."
-        else:
-            mult, outcome = 1.5, "Player BJ!"
-    elif is_blackjack(dealer) or player_total > 21:
-        mult, outcome = -1, "Player Lose"
-    else:
-        if dealer_total > 21 or player_total > dealer_total:
-            mult, outcome = 1, "Player Win"
-        elif player_total < dealer_total:
-            mult, outcome = -1, "Player Lose"
-        else:
-            outcome = "Push"
+def table_changed(event: str, rnd, slot: int) -> None:
+    global stale
+    stale = True
 
-    if is_double_down[idx - 1]:
-        mult *= 2
-    chips[hand_to_player[idx - 1] - 1] += bet * mult
-    return outcome
+# --- render caches ----------------------------------------------------------
+scaled_cards: dict[tuple[int, tuple[int, int]], pygame.Surface] = {}  # (card, size) -> surface
+shown: set[tuple[pygame.Surface, tuple[float, float]]] = set()  # what is on screen now
 
 
-def flatten_hands(h) -> None:
-    global flat_hands
-    for item in h:
-        flatten_hands(item) if isinstance(item, list) else flat_hands.append(item)
+def card_surface(card: int, size: tuple[int, int]) -> pygame.Surface:
+    """``card`` (a code, or BACK) scaled to ``size``.
 
+    Every card on screen shares one size, so the cache is emptied whenever
+    the size changes (a split adds a lane) instead of growing.
+    """
+    surf = scaled_cards.get((card, size))
+    if surf is None:
+        if scaled_cards and next(iter(scaled_cards))[1] != size:
+            scaled_cards.clear()
+        surf = scaled_cards[(card, size)] = pygame.transform.scale(atlas[card], size)
+    return surf
+
+
+@lru_cache(maxsize=512)
+def text_surface(text: str, underline: bool = False) -> pygame.Surface:
+    return (font_underline if underline else font).render(text, True, "black")
 
-def reset_options(active_hand: list[str]) -> None:
-    global options
-    options = ["hit", "stand"]
-    if len(active_hand) == 2 and active_hand[0][1] == active_hand[1][1]:
-        options.append("split")
-    if calc_total(active_hand) in (10, 11) and len(active_hand) == 2:
-        options.append("double down")
+
+@lru_cache(maxsize=64)
+def button_surface(label: str, length: float, chip: bool) -> pygame.Surface:
+    """A whole button (frame, label and chip image) rendered once."""
+    btn_top = HEIGHT - HEIGHT / 5
+    surf = pygame.Surface((length, HEIGHT / 5)).convert()
+    surf.fill("white")
+    pygame.draw.rect(surf, "black", surf.get_rect(), 3, 5)
+
+    txt_parts = ["con", "firm"] if label == "confirm" else label.split()
+    for j, part in enumerate(txt_parts):
+        y_off = (btn_top / 30 * len(txt_parts)) * (j - 0.5) if len(txt_parts) > 1 else 0
+        text = text_surface(part)
+        surf.blit(text, text.get_rect(center=(length / 2, 15 + btn_top / 10 + y_off)))
+
+    if chip:
+        surf.blit(chip_image(label), (10, 30))
+    return surf
 
 
 # ---------------------------------------------------------------------------#
 #                               drawing routine                              #
 # ---------------------------------------------------------------------------#
+def hand_message(slot: int) -> str:
+    if rnd is None:
+        return ""
+    arena = rnd.arena
+    if rnd.outcomes:
+        return OUTCOME_TEXT[arena.outcome[slot]]
+    if arena.status[slot]:
+        return STATUSES[arena.status[slot]]
+    p_num = arena.player[slot]
+    return f"Rebought for ${table.rebuy_amount}" if p_num in rnd.rebought else ""
+
+
 def draw_game():
-    global hand, active, options, messages, turn, chips, hand_to_player, editing_bet
-    buttons = []
+    """Lay out the frame as (surface, position) pairs, plus the button rects.
+
+    Nothing is drawn here; every surface comes out of a cache, so an
+    unchanged table yields the very same list as the frame before.
+    """
+    global options
+    buttons, items = [], []
 
     # ----- button set -------------------------------------------------------
-    if active and 0 < turn <= len(hand_to_player):
-        reset_options(hand[turn])
-    elif editing_bet:
+    if phase is Phase.PLAYING:
+        options = rnd.options()
+    elif phase is Phase.BETTING:
         options = ["confirm", "1", "5", "25", "clear"]
+    elif phase is Phase.DRILLING:
+        options = drill_pool.options(scenario) + ["done"]
     else:
-        options = ["deal", "reveal count", "change bet"]
+        options = ["deal", "reveal count", "change bet", "drill"]
 
+    length = (WIDTH - 20 - 6 * len(options)) / len(options)
+    btn_top = HEIGHT - HEIGHT / 5
     for i, label in enumerate(options):
-        length = (WIDTH - 20 - 6 * len(options)) / len(options)
-        btn_top = HEIGHT - HEIGHT / 5
-        rect = pygame.draw.rect(
-            screen, "white", [13 + i * (length + 6), btn_top - 15, length, HEIGHT / 5], 0, 5
-        )
-        pygame.draw.rect(
-            screen, "black", [13 + i * (length + 6), btn_top - 15, length, HEIGHT / 5], 3, 5
-        )
-
-        txt_parts = ["con", "firm"] if label == "confirm" else label.split()
-        for j, part in enumerate(txt_parts):
-            y_off = (btn_top / 30 * len(txt_parts)) * (j - 0.5) if len(txt_parts) > 1 else 0
-            text = font.render(part, True, "black")
-            text_rect = text.get_rect(
-                center=(13 + i * (length + 6) + length / 2, btn_top + btn_top / 10 + y_off)
-            )
-            screen.blit(text, text_rect)
-
-        if editing_bet and 1 <= i <= 3:
-            chip = pygame.image.load(f"images/chip{label}.png")
-            screen.blit(pygame.transform.scale(chip, (60, 60)), (13 + i * (length + 6) + 10, btn_top + 15))
-        buttons.append(rect)
+        surf = button_surface(label, length, phase is Phase.BETTING and 1 <= i <= 3)
+        pos = (13 + i * (length + 6), btn_top - 15)
+        items.append((surf, pos))
+        buttons.append(surf.get_rect(topleft=pos))
 
     # ----- card dimensions --------------------------------------------------
-    lane_h = 440 / (len(hand_to_player) + 1)
-    card_h = min(lane_h - 30, 100)
-    card_w = card_h / face_down.get_height() * face_down.get_width()
+    dealer = rnd.dealer if rnd else ()
+    slots = rnd.arena.order() if rnd else [None] * NUM_PLAYERS
+    lane_h = 440 / (len(slots) + 1)
+    card_h = max(min(lane_h - 30, 100), MIN_CARD_H)
+    card_w = card_h / CARD_H * CARD_W
+    size = (int(card_w), int(card_h))
+
+    if phase is Phase.DRILLING:
+        draw_drill(items, size)
+        return buttons, items
 
     # ----- dealer -----------------------------------------------------------
-    screen.blit(font.render("Dealer's Hand", True, "black"), (10, 10))
-    screen.blit(font.render(messages[0], True, "black"), (200, 10))
-    for i, card in enumerate(hand[0]):
-        img = face_down if active and i == 1 else card_images[card]
-        img = pygame.transform.scale(img, (card_w, card_h))
-        screen.blit(img, (i * card_w + 10, 25 + TOP_OFFSET[NUM_PLAYERS - 1]))
+    items.append((text_surface("Dealer's Hand"), (10, 10)))
+    playing = phase is Phase.PLAYING
+    if playing and not banner:
+        items.append((text_surface(f"Tip: {recommend(rnd.current, dealer[0], RULES, options)}"), (200, 10)))
+    elif banner:
+        items.append((text_surface(banner), (200, 10)))
+    for i, card in enumerate(dealer):
+        img = card_surface(BACK if playing and i == 1 else card, size)
+        items.append((img, (i * card_w + 10, 25 + TOP_OFFSET[NUM_PLAYERS - 1])))
 
     # ----- players ----------------------------------------------------------
-    for idx in range(len(hand_to_player)):
-        p_num = hand_to_player[idx]
-        title_font = font_underline if active and idx + 1 == turn else font
+    y_off = TOP_OFFSET[min(len(slots), len(TOP_OFFSET)) - 1]
+    for idx, s in enumerate(slots):
+        p_num = rnd.arena.player[s] if rnd else idx + 1
         y_base = 15 + lane_h * (idx + 1)
 
-        screen.blit(title_font.render(f"Player {p_num}'s Hand", True, "black"), (10, y_base))
-        screen.blit(
-            font.render(f"${chips[p_num - 1]} {messages[idx + 1]}", True, "black"), (215, y_base)
-        )
-
-        for c_idx, card in enumerate(hand[idx + 1]):
-            img = pygame.transform.scale(card_images[card], (card_w, card_h))
-            screen.blit(img, (c_idx * card_w + 10, lane_h * (idx + 1) + 30 + TOP_OFFSET[len(hand_to_player) - 1]))
-
-    return buttons
+        items.append((text_surface(f"Player {p_num}'s Hand", playing and s == rnd.slot), (10, y_base)))
+        items.append((text_surface(f"${table.chips[p_num - 1]} {hand_message(s)}"), (215, y_base)))
+
+        for c_idx, card in enumerate(rnd.arena.hand[s] if rnd else ()):
+            y = lane_h * (idx + 1) + 30 + y_off
+            items.append((card_surface(card, size), (c_idx * card_w + 10, y)))
+
+    return buttons, items
+
+
+def draw_drill(items, size: tuple[int, int]) -> None:
+    """The drill on screen: the upcard and hole card, one player hand, the count."""
+    hand, upcard = drill_cards
+    items.append((text_surface("Dealer's Hand"), (10, 10)))
+    if banner:
+        items.append((text_surface(banner), (200, 10)))
+    for i, card in enumerate((upcard, BACK)):
+        items.append((card_surface(card, size), (i * size[0] + 10, 25 + TOP_OFFSET[0])))
+
+    lane_h = 440 / 2
+    correct, answered = drill_score
+    items.append((text_surface("Your Hand", True), (10, 15 + lane_h)))
+    items.append((text_surface(f"TC {scenario.true_count:+d}  {correct}/{answered}"), (215, 15 + lane_h)))
+    for c_idx, card in enumerate(hand):
+        items.append((card_surface(card, size), (c_idx * size[0] + 10, lane_h + 30 + TOP_OFFSET[0])))
+
+
+def render(items) -> None:
+    """Repaint only where the frame differs from what is on screen."""
+    global shown
+    now = set(items)
+    dirty = [surf.get_rect(topleft=pos) for surf, pos in now ^ shown]
+    shown = now
+    if not dirty:
+        return
+    for area in dirty:
+        screen.set_clip(area)
+        screen.fill("white")
+        for surf, pos in items:
+            screen.blit(surf, pos)
+    screen.set_clip(None)
+    pygame.display.update(dirty)
 
 
 # ---------------------------------------------------------------------------#
-#                                round reset                                 #
+#                              state transitions                             #
 # ---------------------------------------------------------------------------#
-def reset():
-    global hand, curr, bet, active, first_deal, messages, turn
-    global new_bet, is_double_down, hand_to_player, first_finished
+def deal():
+    global rnd, bet, banner
 
-    turn = 1
-    active = True
-    first_deal = False
     bet = new_bet
-    messages = [""] * (NUM_PLAYERS + 1)
-
-    # auto-rebuy
-    for idx in range(NUM_PLAYERS):
-        if chips[idx] < MIN_BET:
-            chips[idx] += REBUY_AMOUNT
-            messages[idx + 1] = f"Rebought for ${REBUY_AMOUNT}"
-
-    is_double_down = [False] * NUM_PLAYERS
-    hand_to_player = [i + 1 for i in range(NUM_PLAYERS)]
-    first_finished = False
-
-    if curr >= cut:
-        shuffle()
-
-    if bet < MIN_BET or any(ch < bet for ch in chips):
+    if bet < MIN_BET or any(ch < bet for ch in table.chips):
         bet = MIN_BET
+    for p in range(1, NUM_PLAYERS + 1):
+        table.place_bet(p, bet)
 
-    hand[:] = [[] for _ in range(NUM_PLAYERS + 1)]
-    for i in range(NUM_PLAYERS + 1):
-        hand[i] = draw_card(hand[i], 2)
+    rnd = table.new_round()
+    banner = "Deck Shuffled!" if rnd.shuffled else ""
+    after_action()
 
-    reset_options(hand[1])
 
-    if calc_total(hand[0]) == 21:
-        active = False
+def after_action():
+    """Stay in PLAYING while a hand is to act; otherwise settle the round."""
+    global phase
+    if rnd.active:
+        phase = Phase.PLAYING
+    else:
+        rnd.finish()
+        phase = Phase.BETWEEN
+
+
+def next_drill() -> None:
+    global scenario, drill_cards
+    scenario = next(drill_pool)
+    drill_cards = drill_pool.cards(scenario)
+
+
+def drill(label: str) -> None:
+    """Grade ``label`` against the drill on screen and serve the next one."""
+    global banner
+    grade = drill_pool.grade(scenario, label)
+    drill_score[0] += grade.correct
+    drill_score[1] += 1
+    banner = "Correct!" if grade.correct else f"{grade.best} -{grade.loss:.2f}"
+    next_drill()
+
+
+def click(label: str) -> None:
+    """Apply the button ``label`` to the current phase.
+
+    Engine changes mark the layout stale through the change feed; the UI's
+    own state (phase, banner, bet) is marked here.
+    """
+    global phase, banner, new_bet, stale, drill_pool
+    if phase is not Phase.PLAYING or banner:
+        stale = True
+    if phase is Phase.BETWEEN:
+        if label == "deal":
+            deal()
+        elif label == "drill":
+            if drill_pool is None:
+                try:
+                    drill_pool = DrillPool(RULES, stats=DrillStats(stats_path(RULES)))
+                except FileNotFoundError as e:  # not generated for these rules
+                    print(e, file=sys.stderr)
+                    banner = "No drill table"
+                    return
+            phase = Phase.DRILLING
+            banner = ""
+            drill_score[:] = [0, 0]
+            next_drill()
+        elif label == "reveal count":
+            banner = f"Count: {table.shoe.running_count} TC {table.shoe.true_count:+.1f}"
+        elif label == "change bet":
+            phase = Phase.BETTING
+            new_bet = bet
+            banner = f"New Bet: ${new_bet}"
+
+    elif phase is Phase.BETTING:
+        if label == "confirm":
+            phase = Phase.BETWEEN
+        elif label == "clear":
+            new_bet = MIN_BET
+        else:
+            new_bet += int(label)
+        banner = f"New Bet: ${new_bet}"
+
+    elif phase is Phase.DRILLING:
+        if label == "done":
+            phase = Phase.BETWEEN
+            banner = ""
+            drill_pool.stats.save()
+        else:
+            drill(label)
+
+    else:
+        banner = ""
+        rnd.act(label)
+        after_action()
 
 
 # ---------------------------------------------------------------------------#
 #                                main loop                                   #
 # ---------------------------------------------------------------------------#
-while running:
-    clock.tick(FPS)
-    screen.fill("white")
-    buttons = draw_game()
-
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-
-        if event.type == pygame.MOUSEBUTTONUP:
-            if not active and not editing_bet:
-                if buttons[0].collidepoint(event.pos):
-                    reset()
-                elif buttons[1].collidepoint(event.pos):
-                    messages[0] = f"Count: {running_count}"
-                elif buttons[2].collidepoint(event.pos):
-                    editing_bet = True
-                    new_bet = bet
-
-            elif editing_bet:
-                if buttons[0].collidepoint(event.pos):
-                    editing_bet = False
-                elif buttons[1].collidepoint(event.pos):
-                    new_bet += 1
-                elif buttons[2].collidepoint(event.pos):
-                    new_bet += 5
-                elif buttons[3].collidepoint(event.pos):
-                    new_bet += 25
-                elif buttons[4].collidepoint(event.pos):
-                    new_bet = MIN_BET
-
-            else:  # active hand
-                messages[0] = ""
-                if buttons[0].collidepoint(event.pos):
-                    hand[turn] = draw_card(hand[turn])
-                    if calc_total(hand[turn]) > 21:
-                        messages[turn] = "bust"
-                        turn += 1
-
-                elif buttons[1].collidepoint(event.pos):
-                    messages[turn] = "stand"
-                    turn += 1
-
-                elif (
-                    len(buttons) > 2
-                    and buttons[2].collidepoint(event.pos)
-                    and options[2] == "split"
-                ):
-                    hand_to_player.insert(turn, hand_to_player[turn - 1])
-                    hand.insert(turn, [hand[turn].pop(0)])
-                    is_double_down.insert(turn, False)
-                    messages.insert(turn, "")
-                    hand[turn] = draw_card(hand[turn])
-                    hand[turn + 1] = draw_card(hand[turn + 1])
-                    messages[turn] = messages[turn + 1] = "split"
-
-                elif (
-                    (len(buttons) > 2 and buttons[2].collidepoint(event.pos) and options[2] == "double down")
-                    or (len(buttons) > 3 and buttons[3].collidepoint(event.pos) and options[3] == "double down")
-                ):
-                    is_double_down[turn - 1] = True
-                    hand[turn] = draw_card(hand[turn])
-                    messages[turn] = "double down"
-                    turn += 1
-
-    if turn > len(hand_to_player):
-        active = False
-
-    if active and is_blackjack(hand[turn]):
-        messages[turn] = "blackjack!"
-        turn += 1
-
-    if editing_bet:
-        messages[0] = f"New Bet: ${new_bet}"
-
-    if not active and not first_deal and not first_finished:
-        while calc_total(hand[0]) < 17:
-            hand[0] = draw_card(hand[0])
-        for i in range(1, len(hand_to_player) + 1):
-            messages[i] = compare_hand(hand[i], hand[0], i)
-
-        flat_hands.clear()
-        flatten_hands(hand)
-        running_count += sum(COUNT_VALUES[c[1]] for c in flat_hands)
-        first_finished = True
+# Block until something happens and redraw only after a transition or when
+# the window needs repainting, so an idle table costs no CPU.
+def main(argv=None) -> None:
+    global running, table, stale
+    parser = argparse.ArgumentParser(description="Pygame blackjack.")
+    parser.add_argument("--connect", metavar="ADDRESS", help="play a table hosted by tableserver.py (host:port or socket path)")
+    args = parser.parse_args(argv)
+    try:
+        load_table(RULES)  # a missing strategy table fails here, not at the first tip
+    except FileNotFoundError as e:
+        parser.error(str(e))
+    if args.connect:
+        from tableserver import RemoteTable
+
+        table = RemoteTable(args.connect, NUM_PLAYERS)
+    table.watch(table_changed)
 
+    screen.fill("white")
     pygame.display.flip()
-
-pygame.quit()
\ No newline at end of file
+    buttons, items = draw_game()
+    render(items)
+    while running:
+        dirty = False
+        for event in [pygame.event.wait(WAIT_MS), *pygame.event.get()]:
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.MOUSEBUTTONUP:
+                clicked = [label for label, b in zip(options, buttons) if b.collidepoint(event.pos)]
+                if clicked:
+                    click(clicked[0])
+                if clicked and stale:
+                    start = perf_counter_ns()
+                    buttons, items = draw_game()  # later events hit the new buttons
+                    if metrics is not None:
+                        metrics.add_time("layout", perf_counter_ns() - start)
+                    stale = False
+                    dirty = True
+            elif event.type in (pygame.VIDEORESIZE, pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                shown.clear()
+                screen.fill("white")
+                dirty = True
+
+        if dirty and running:
+            start = perf_counter_ns()
+            render(items)
+            if metrics is not None:
+                metrics.add_time("render", perf_counter_ns() - start)
+
+    pygame.quit()
+    if drill_pool is not None:
+        drill_pool.stats.save()
+    if metrics is not None:
+        with open(METRICS_PATH, "w") as f:
+            f.write(metrics.prometheus())
+
+
+if __name__ == "__main__":
+    main()
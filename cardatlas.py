@@ -0,0 +1,53 @@
+# cardatlas.py
+"""Every card face plus the card back packed into one image.
+
+Slot ``code`` holds the card with that engine code and slot ``BACK`` the
+face-down image, laid out ``COLUMNS`` to a row. The sheet is decoded the
+first time a card is asked for, and each card is a subsurface of it, so
+startup decodes nothing. Rebuild it from the loose PNGs with
+``python cardatlas.py``.
+"""
+import pygame
+
+from engine import CARDS
+
+ATLAS_PATH = "images/cards.png"
+CARD_W, CARD_H = 53, 73
+COLUMNS = 13
+BACK = len(CARDS)
+NAMES = [*CARDS, "card_face_down"]  # by slot
+
+
+def _rect(slot: int) -> pygame.Rect:
+    return pygame.Rect(slot % COLUMNS * CARD_W, slot // COLUMNS * CARD_H, CARD_W, CARD_H)
+
+
+def build(path: str = ATLAS_PATH) -> str:
+    rows = -(-len(NAMES) // COLUMNS)
+    sheet = pygame.Surface((COLUMNS * CARD_W, rows * CARD_H))
+    sheet.fill("white")
+    for slot, name in enumerate(NAMES):
+        sheet.blit(pygame.image.load(f"images/{name}.png"), _rect(slot))
+    pygame.image.save(sheet, path)
+    return path
+
+
+class CardAtlas:
+    """``atlas[slot]`` is the card image for a card code, or the back at ``BACK``."""
+
+    def __init__(self, path: str = ATLAS_PATH):
+        self.path = path
+        self._sheet: pygame.Surface | None = None
+        self._cards: dict[int, pygame.Surface] = {}
+
+    def __getitem__(self, slot: int) -> pygame.Surface:
+        card = self._cards.get(slot)
+        if card is None:
+            if self._sheet is None:
+                self._sheet = pygame.image.load(self.path).convert()  # needs a display mode set
+            card = self._cards[slot] = self._sheet.subsurface(_rect(slot))
+        return card
+
+
+if __name__ == "__main__":
+    print(build())
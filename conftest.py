@@ -0,0 +1,3 @@
+# conftest.py
+# Marks the repository root, so the tests import the top-level modules
+# (tableserver, textblackjack) and the engine package from the checkout.
@@ -0,0 +1,59 @@
+# engine/__init__.py
+"""Headless blackjack engine: no pygame, no I/O, no work done at import time."""
+from .cards import (
+    ACE_CODES,
+    CARD_VALUES,
+    CARDS,
+    CODE_COUNTS,
+    CODE_RANKS,
+    CODE_VALUES,
+    COUNT_VALUES,
+    NUM_DECKS,
+    PAYOUTS,
+    RANK_COUNTS,
+    RANK_VALUES,
+    RANKS,
+    SUITS,
+    Hand,
+    Outcome,
+    calc_total,
+    card_code,
+    compare_hand,
+    is_blackjack,
+    rank_name,
+)
+from .shoe import PENETRATION, Shoe, derive_seed
+from .arena import HandArena
+from .table import MIN_BET, REBUY_AMOUNT, STARTING_CHIPS, InstrumentedRound, Round, Table
+from .metrics import Metrics
+from .rules import DEFAULT_RULES, RuleConfig, Rules, hand_options
+from .simulate import SimResult, mimic_dealer, never_bust, simulate
+from .strategy import basic_strategy, recommend
+from .exact import dealer_probabilities, full_shoe_table, hand_evs, shoe_composition
+from .counting import HI_LO, KO, OMEGA_II, SYSTEMS, ZEN, CountSystem, betting_correlation
+from .deviations import ILLUSTRIOUS_18, Deviation, DeviationStrategy, playing_efficiency
+
+# Process pools, statistics and file formats: imported on first use, so that
+# ``import engine`` stays cheap for the front-ends.
+_LAZY = {
+    "parallel": ("simulate_parallel",),
+    "bankroll": ("BankrollStats", "analyze", "count_table", "simulate_count_table"),
+    "drills": ("DrillPool", "DrillStats", "Grade", "Scenario"),
+    "history": ("HandRecord", "HistoryLog", "HistoryWriter", "columns", "export_columns", "read_history"),
+}
+_LAZY_NAMES = {name: module for module, names in _LAZY.items() for name in names}
+
+
+def __getattr__(name: str):
+    module = _LAZY_NAMES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+
+    value = getattr(import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted([*globals(), *_LAZY_NAMES])
@@ -0,0 +1,126 @@
+# engine/arena.py
+"""Split and double-down hands as a flat arena of fixed slots.
+
+A round's hands live in preallocated parallel columns indexed by slot, so
+splitting a hand writes one new slot and relinks two ``next`` pointers
+instead of inserting into half a dozen lists. Slots are numbered in the
+order they were made (one per seat, then one per split); play order is the
+linked list from ``head``, with every split hand played right after the hand
+it came from.
+
+Every column but ``hand`` is a typed ``array``, so a slot costs a few bytes
+of game data rather than a pointer per field, and statuses are stored as
+codes whose text (``STATUSES``) is only looked up when a hand is drawn.
+"""
+from array import array
+
+from .cards import NUM_DECKS
+
+SPLIT, DOUBLED, SURRENDERED = 1, 2, 4  # ``flags`` bits
+END = -1  # ``next`` of the last hand, ``parent`` of a dealt hand
+NO_OUTCOME = 0xFF  # ``outcome`` until the hand is settled
+STATUSES = ("", "blackjack!", "split", "bust", "stand", "double down", "surrender")
+BLACKJACK_HAND, SPLIT_HAND, BUST, STAND, DOUBLE_DOWN, SURRENDER = range(1, len(STATUSES))  # ``status`` codes
+
+
+class HandArena:
+    """Columns of ``capacity`` hand slots, reused from round to round.
+
+    ``hand[s]`` is the slot's hand (a ``Hand`` in ``Round``), ``player[s]``
+    its 1-based seat, ``parent[s]`` the slot it was split from, ``next[s]``
+    the slot played after it, and ``bet[s]`` its own bet, doubled in place
+    by a double down. ``splits[s]`` counts the splits made while ``s`` was
+    being played; ``total``, ``status`` (an index into ``STATUSES``) and
+    ``outcome`` (an ``Outcome``, or ``NO_OUTCOME``) are filled in as the
+    hand is played and settled.
+    """
+
+    __slots__ = (
+        "capacity",
+        "size",
+        "head",
+        "tail",
+        "hand",
+        "player",
+        "parent",
+        "next",
+        "bet",
+        "flags",
+        "splits",
+        "total",
+        "status",
+        "outcome",
+    )
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.hand = [None] * capacity
+        self.player = array("B", bytes(capacity))
+        self.parent = array("h", [END]) * capacity
+        self.next = array("h", [END]) * capacity
+        self.bet = array("q", bytes(8 * capacity))
+        self.flags = array("B", bytes(capacity))
+        self.splits = array("B", bytes(capacity))
+        self.total = array("B", bytes(capacity))
+        self.status = array("B", bytes(capacity))
+        self.outcome = array("B", [NO_OUTCOME]) * capacity
+        self.size = 0
+        self.head = self.tail = END
+
+    @classmethod
+    def for_table(cls, num_players: int, max_hands: int = 0, num_decks: int = NUM_DECKS) -> "HandArena":
+        """Enough slots for every seat to split as far as the rules allow: a
+        pair can be split at most once per card of its rank in the shoe."""
+        return cls(num_players * (max_hands or 4 * num_decks))
+
+    def reset(self) -> None:
+        """Forget the last round; the columns keep their (stale) values."""
+        self.size = 0
+        self.head = self.tail = END
+
+    def _new(self, hand, player: int, bet, parent: int, flags: int) -> int:
+        s = self.size
+        if s == self.capacity:
+            raise IndexError(f"hand arena is full ({s} slots)")
+        self.size = s + 1
+        self.hand[s] = hand
+        self.player[s] = player
+        self.parent[s] = parent
+        self.bet[s] = bet
+        self.flags[s] = flags
+        self.splits[s] = self.total[s] = self.status[s] = 0
+        self.outcome[s] = NO_OUTCOME
+        return s
+
+    def add(self, hand, player: int, bet) -> int:
+        """A dealt hand, played after every hand already in the arena."""
+        s = self._new(hand, player, bet, END, 0)
+        self.next[s] = END
+        if self.tail == END:
+            self.head = s
+        else:
+            self.next[self.tail] = s
+        self.tail = s
+        return s
+
+    def split(self, slot: int, hand) -> int:
+        """``hand``, split off ``slot``, played right after it with the same bet."""
+        s = self._new(hand, self.player[slot], self.bet[slot], slot, SPLIT)
+        self.flags[slot] |= SPLIT
+        self.splits[slot] += 1
+        self.next[s] = self.next[slot]
+        self.next[slot] = s
+        if self.tail == slot:
+            self.tail = s
+        return s
+
+    def order(self) -> list[int]:
+        """Slots in play order."""
+        slots, s = [], self.head
+        while s != END:
+            slots.append(s)
+            s = self.next[s]
+        return slots
+
+    def __len__(self) -> int:
+        return self.size
@@ -0,0 +1,120 @@
+# engine/bankroll.py
+"""Bet-ramp and bankroll analysis from per-true-count EV/variance tables.
+
+One simulation (or ``simulate_parallel`` run) gives, for each floored true
+count, how often a round starts there and the mean and variance of its
+result per unit bet. Any bet ramp keyed by true count can then be scored in
+closed form without replaying a hand, so sweeping hundreds of ramps costs
+one simulation plus microseconds per ramp.
+"""
+import math
+from bisect import bisect_right
+from dataclasses import dataclass
+from statistics import NormalDist
+
+from .counting import HI_LO, CountSystem
+from .parallel import simulate_parallel
+from .rules import Rules
+from .simulate import SimResult
+
+
+@dataclass(frozen=True)
+class CountRow:
+    frequency: float
+    ev: float
+    variance: float
+
+
+def count_table(result: SimResult) -> dict[int, CountRow]:
+    """Per-true-count frequency, EV and variance (per unit bet) from a run."""
+    table = {}
+    for tc, (rounds, net, sum_sq) in sorted(result.true_counts.items()):
+        ev = net / rounds
+        var = sum_sq / rounds - ev * ev
+        table[tc] = CountRow(rounds / result.hands, ev, var)
+    return table
+
+
+def simulate_count_table(
+    rules: Rules | None = None,
+    strategy=None,
+    n_hands: int = 10_000_000,
+    seed=0,
+    system: CountSystem = HI_LO,
+) -> dict[int, CountRow]:
+    """Run the simulator once, across all cores, and tabulate it by true count."""
+    return count_table(simulate_parallel(rules, strategy, n_hands, seed, system=system))
+
+
+def bet_for(ramp: dict[int, float], tc: int) -> float:
+    """The ramp's bet at ``tc``: the entry for the highest count not above it."""
+    keys = sorted(ramp)
+    i = bisect_right(keys, tc)
+    return ramp[keys[max(i - 1, 0)]]
+
+
+# ---------------------------------------------------------------------------#
+#                                  analysis                                  #
+# ---------------------------------------------------------------------------#
+def _log_cdf(x: float) -> float:
+    """log of the standard normal CDF, without underflow deep in the lower tail."""
+    if x > -20:
+        return math.log(NormalDist().cdf(x))
+    # asymptotic (Mills ratio) expansion; relative error below 1e-6 from here on
+    return -x * x / 2 - math.log(-x) - 0.5 * math.log(2 * math.pi) + math.log1p(-1 / x**2 + 3 / x**4)
+
+
+@dataclass(frozen=True)
+class BankrollStats:
+    """Per-round figures in betting units."""
+
+    win_rate: float
+    variance: float
+    avg_bet: float
+    bankroll: float
+
+    @property
+    def sd(self) -> float:
+        return math.sqrt(self.variance)
+
+    @property
+    def win_rate_100(self) -> float:
+        return 100 * self.win_rate
+
+    @property
+    def sd_100(self) -> float:
+        return 10 * self.sd
+
+    @property
+    def n0(self) -> float:
+        """Rounds needed for expected win to equal one standard deviation."""
+        return self.variance / self.win_rate**2 if self.win_rate else math.inf
+
+    def risk_of_ruin(self, n_rounds: int | None = None) -> float:
+        """Probability of losing the bankroll, forever or within ``n_rounds``.
+
+        Diffusion approximation: the bankroll is a Brownian motion with the
+        ramp's drift and variance per round. The finite-horizon reflection
+        term is taken in log space, since its exponential overflows for a
+        losing game with a deep bankroll while the term itself stays small.
+        """
+        mu, var, b = self.win_rate, self.variance, self.bankroll
+        if var <= 0:
+            return 0.0 if mu >= 0 else 1.0
+        if n_rounds is None:
+            return 1.0 if mu <= 0 else min(1.0, math.exp(-2 * mu * b / var))
+        sd_n = math.sqrt(var * n_rounds)
+        phi = NormalDist().cdf
+        reflected = math.exp(-2 * mu * b / var + _log_cdf((-b + mu * n_rounds) / sd_n))
+        return min(1.0, phi((-b - mu * n_rounds) / sd_n) + reflected)
+
+
+def analyze(ramp: dict[int, float], bankroll: float, table: dict[int, CountRow]) -> BankrollStats:
+    """Score ``ramp`` (true count -> units bet) against a ``count_table``."""
+    win = second = avg = 0.0
+    for tc, row in table.items():
+        bet = bet_for(ramp, tc)
+        win += row.frequency * bet * row.ev
+        second += row.frequency * bet * bet * (row.variance + row.ev * row.ev)
+        avg += row.frequency * bet
+    return BankrollStats(win, second - win * win, avg, bankroll)
@@ -0,0 +1,153 @@
+# engine/batch.py
+"""Vectorized dealer play-out and settlement over many shoes at once.
+
+Each row of ``shoes`` is one round dealt in ``Round`` order from a shuffled
+shoe of rank indices: the dealer's two cards in columns 0-1, the player's in
+columns 2-3, the player's hits after that, and the dealer's draws after the
+player's last card. The work is done one card position at a time across all
+rows, never one hand at a time. Requires NumPy; importing the engine itself
+does not.
+"""
+import numpy as np
+
+from .cards import RANK_VALUES, RANKS, Hand, Outcome, compare_hand
+from .rules import DEFAULT_RULES, Rules
+
+ACE = RANKS.index("A")
+HARD_VALUES = np.array([1 if r == ACE else v for r, v in enumerate(RANK_VALUES)], dtype=np.int16)
+
+
+def shuffled_shoes(n: int, num_decks: int = DEFAULT_RULES.num_decks, seed=None, depth: int | None = None) -> np.ndarray:
+    """``n`` independently shuffled shoes of rank indices, one per row.
+
+    With ``depth`` only the first ``depth`` cards of each row are drawn (a
+    partial Fisher-Yates), which is all a round needs and much cheaper.
+    """
+    rng = np.random.default_rng(seed)
+    shoe = np.repeat(np.arange(len(RANKS), dtype=np.uint8), 4 * num_decks)
+    shoes = np.tile(shoe, (n, 1))
+    rows = np.arange(n)
+    for j in range(min(depth or shoe.size, shoe.size - 1)):
+        r = rng.integers(j, shoe.size, n)
+        picked = shoes[rows, r]
+        shoes[rows, r] = shoes[:, j]
+        shoes[:, j] = picked
+    return shoes[:, :depth] if depth else shoes
+
+
+def shuffled_codes(k: int, num_decks: int, seed, cut_range: tuple[int, int]) -> tuple[np.ndarray, np.ndarray]:
+    """``k`` whole shuffled shoes of card codes (one per row) and a cut for each.
+
+    Each row is the argsort of independent uniform keys, a uniformly random
+    permutation drawn for all rows in one call.
+    """
+    rng = np.random.default_rng(seed)
+    fresh = np.tile(np.arange(len(RANKS) * 4, dtype=np.uint8), num_decks)
+    order = rng.random((k, fresh.size)).argsort(axis=1)
+    return fresh[order], rng.integers(*cut_range, size=k)
+
+
+def _best_total(hard, has_ace):
+    """calc_total from the all-aces-as-one sum: count one ace as 11 if it fits."""
+    return np.where(has_ace & (hard + 10 <= 21), hard + 10, hard)
+
+
+def _dealer_draws(total, hard, h17: bool):
+    """Rows where the dealer takes another card: under 17, or soft 17 under H17."""
+    if h17:
+        return (total < 17) | ((total == 17) & (hard != 17))
+    return total < 17
+
+
+def settle_batch(
+    shoes: np.ndarray,
+    player_hits=0,
+    doubled=False,
+    rules: Rules = DEFAULT_RULES,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Play every row's dealer out under ``rules`` and settle it like ``compare_hand``.
+
+    ``player_hits`` (per row or scalar) is how many cards the player drew
+    after the first two; ``doubled`` marks rows whose stake is two units.
+    Returns ``(payout, outcome)``: net units won per row and ``Outcome`` codes.
+    """
+    shoes = np.asarray(shoes, dtype=np.uint8)
+    n, width = shoes.shape
+    rows = np.arange(n)
+    hits = np.broadcast_to(np.asarray(player_hits, dtype=np.intp), (n,))
+    stake = np.where(np.broadcast_to(np.asarray(doubled, dtype=bool), (n,)), 2.0, 1.0)
+
+    # ----- player: columns 2 .. 3 + hits ------------------------------------
+    max_hits = int(hits.max()) if n else 0
+    cols = shoes[:, 2 : 4 + max_hits]
+    in_hand = np.arange(cols.shape[1])[None, :] < (2 + hits)[:, None]
+    p_hard = (HARD_VALUES[cols] * in_hand).sum(axis=1)
+    p_ace = ((cols == ACE) & in_hand).any(axis=1)
+    player = _best_total(p_hard, p_ace)
+    player_natural = (hits == 0) & (player == 21)
+
+    # ----- dealer: two cards, then draw from after the player's last --------
+    d_hard = HARD_VALUES[shoes[:, 0]] + HARD_VALUES[shoes[:, 1]]
+    d_ace = (shoes[:, 0] == ACE) | (shoes[:, 1] == ACE)
+    dealer = _best_total(d_hard, d_ace)
+    dealer_natural = dealer == 21
+    nxt = 4 + hits
+    drawing = _dealer_draws(dealer, d_hard, rules.hit_soft_17)
+    while drawing.any():
+        idx = rows[drawing]
+        if int(nxt[idx].max()) >= width:
+            raise ValueError("shoe rows too short for the dealer to finish")
+        card = shoes[idx, nxt[idx]]
+        d_hard[idx] += HARD_VALUES[card]
+        d_ace[idx] |= card == ACE
+        nxt[idx] += 1
+        dealer = _best_total(d_hard, d_ace)
+        drawing = _dealer_draws(dealer, d_hard, rules.hit_soft_17)
+
+    # ----- settlement, in compare_hand's order ------------------------------
+    outcome = np.select(
+        [
+            player_natural & dealer_natural,
+            player_natural,
+            player > 21,
+            dealer_natural,
+            dealer > 21,
+            player > dealer,
+            player < dealer,
+        ],
+        [
+            Outcome.BLACKJACK_PUSH,
+            Outcome.BLACKJACK,
+            Outcome.BUST,
+            Outcome.DEALER_BLACKJACK,
+            Outcome.DEALER_BUST,
+            Outcome.WIN,
+            Outcome.LOSE,
+        ],
+        default=Outcome.PUSH,
+    ).astype(np.uint8)
+
+    mult = np.array(rules.config.payouts, dtype=np.float64)
+    return mult[outcome] * stake, outcome
+
+
+def settle_scalar(shoes, player_hits=0, doubled=False, rules: Rules = DEFAULT_RULES):
+    """Reference for ``settle_batch``: the same rows through Hand and compare_hand."""
+    shoes = np.asarray(shoes, dtype=np.uint8)
+    n = len(shoes)
+    hits = np.broadcast_to(np.asarray(player_hits, dtype=np.intp), (n,))
+    doubled = np.broadcast_to(np.asarray(doubled, dtype=bool), (n,))
+    payout, outcome = np.zeros(n), np.zeros(n, dtype=np.uint8)
+    hits_dealer, payouts = rules.config.dealer_hits, rules.config.payouts
+    for i, row in enumerate(shoes):
+        codes = [int(r) * 4 for r in row]
+        dealer = Hand(codes[:2])
+        player = Hand(codes[2 : 4 + hits[i]])
+        nxt = 4 + hits[i]
+        while hits_dealer[dealer.soft > 0][dealer.total]:
+            dealer.add(codes[nxt])
+            nxt += 1
+        result = compare_hand(player, dealer)
+        payout[i] = payouts[result] * (2 if doubled[i] else 1)
+        outcome[i] = result
+    return payout, outcome
@@ -0,0 +1,159 @@
+# engine/cards.py
+"""Card data and hand arithmetic shared by every front-end."""
+from enum import IntEnum
+
+# --- card data --------------------------------------------------------------
+RANKS = ["2", "3", "4", "5", "6", "7", "8", "9", "T", "J", "Q", "K", "A"]
+SUITS = ("C", "D", "H", "S")
+COUNT_VALUES = dict(zip(RANKS, [1] * 5 + [0] * 3 + [-1] * 5))
+CARD_VALUES = dict(zip(RANKS, [2, 3, 4, 5, 6, 7, 8, 9, 10, 10, 10, 10, 11]))
+CARDS = [s + r for r in RANKS for s in SUITS]
+NUM_DECKS = 2
+
+# --- integer encoding ---------------------------------------------------------
+# A card code is its index in CARDS: ``rank * 4 + suit``. Shoes and hands hold
+# codes; names are only looked up (``CARDS[code]``) when something is drawn.
+RANK_VALUES = bytes(CARD_VALUES[r] for r in RANKS)
+RANK_COUNTS = tuple(COUNT_VALUES[r] for r in RANKS)
+CODE_RANKS = bytes(code >> 2 for code in range(len(CARDS)))
+CODE_VALUES = bytes(RANK_VALUES[code >> 2] for code in range(len(CARDS)))
+ACE_CODES = frozenset(code for code in range(len(CARDS)) if RANKS[code >> 2] == "A")
+CODE_COUNTS = tuple(COUNT_VALUES[RANKS[code >> 2]] for code in range(len(CARDS)))
+
+
+def card_code(name: str) -> int:
+    return RANKS.index(name[1]) * 4 + SUITS.index(name[0])
+
+
+def rank_name(code: int) -> str:
+    return RANKS[code >> 2]
+
+
+# ---------------------------------------------------------------------------#
+#                                   hands                                    #
+# ---------------------------------------------------------------------------#
+class Hand:
+    """Cards as codes, with the best total and soft-ace count kept up to date.
+
+    ``total`` counts aces as 11 until that would bust; ``soft`` is how many
+    aces are still counted as 11. Adding a card is O(1).
+    """
+
+    __slots__ = ("cards", "total", "soft")
+
+    def __init__(self, codes=()):
+        self.cards = bytearray()
+        self.total = self.soft = 0
+        for code in codes:
+            self.add(code)
+
+    def add(self, code: int) -> None:
+        self.cards.append(code)
+        value = CODE_VALUES[code]
+        self.total += value
+        if value == 11:
+            self.soft += 1
+        while self.total > 21 and self.soft:
+            self.total -= 10
+            self.soft -= 1
+
+    def split(self) -> "Hand":
+        """Remove the first card of a pair and return it as a new one-card hand."""
+        first, second = self.cards
+        self.cards = bytearray()
+        self.total = self.soft = 0
+        self.add(second)
+        return Hand((first,))
+
+    @property
+    def is_pair(self) -> bool:
+        return len(self.cards) == 2 and CODE_RANKS[self.cards[0]] == CODE_RANKS[self.cards[1]]
+
+    def names(self) -> list[str]:
+        return [CARDS[c] for c in self.cards]
+
+    def __len__(self) -> int:
+        return len(self.cards)
+
+    def __iter__(self):
+        return iter(self.cards)
+
+    def __getitem__(self, i):
+        return self.cards[i]
+
+    def __repr__(self) -> str:
+        return f"Hand({self.names()})"
+
+
+# ---------------------------------------------------------------------------#
+#                                 outcomes                                   #
+# ---------------------------------------------------------------------------#
+class Outcome(IntEnum):
+    PUSH = 0
+    WIN = 1
+    LOSE = 2
+    BLACKJACK = 3
+    BLACKJACK_PUSH = 4
+    BUST = 5
+    DEALER_BUST = 6
+    DEALER_BLACKJACK = 7
+    SURRENDER = 8
+
+
+# bet multiplier per outcome, before doubling
+PAYOUTS = {
+    Outcome.PUSH: 0,
+    Outcome.WIN: 1,
+    Outcome.LOSE: -1,
+    Outcome.BLACKJACK: 1.5,
+    Outcome.BLACKJACK_PUSH: 0,
+    Outcome.BUST: -1,
+    Outcome.DEALER_BUST: 1,
+    Outcome.DEALER_BLACKJACK: -1,
+    Outcome.SURRENDER: -0.5,
+}
+
+
+# ---------------------------------------------------------------------------#
+#                              hand arithmetic                               #
+# ---------------------------------------------------------------------------#
+def calc_total(cards_on_table) -> int:
+    if isinstance(cards_on_table, Hand):
+        return cards_on_table.total
+    total = aces = 0
+    for card in cards_on_table:
+        total += CARD_VALUES[card[1]]
+        if card[1] == "A":
+            aces += 1
+    while aces and total > 21:
+        aces -= 1
+        total -= 10
+    return total
+
+
+def is_blackjack(cards_on_table) -> bool:
+    return len(cards_on_table) == 2 and calc_total(cards_on_table) == 21
+
+
+def compare_hand(player: Hand, dealer: Hand, split: bool = False) -> Outcome:
+    """Settle one player hand against the dealer's finished hand.
+
+    A two-card 21 on a split hand counts as an ordinary 21, not a blackjack.
+    """
+    player_total, dealer_total = player.total, dealer.total
+    dealer_bj = dealer_total == 21 and len(dealer.cards) == 2
+
+    if player_total == 21 and len(player.cards) == 2 and not split:
+        return Outcome.BLACKJACK_PUSH if dealer_bj else Outcome.BLACKJACK
+    if player_total > 21:
+        return Outcome.BUST
+    if dealer_bj:
+        return Outcome.DEALER_BLACKJACK
+    if dealer_total > 21:
+        return Outcome.DEALER_BUST
+    if player_total > dealer_total:
+        return Outcome.WIN
+    if player_total < dealer_total:
+        return Outcome.LOSE
+    return Outcome.PUSH
+
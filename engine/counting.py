@@ -0,0 +1,55 @@
+# engine/counting.py
+"""Card-counting systems and the true count.
+
+A count system is a weight per rank, expanded once into a weight per card
+code so that counting a card is a single tuple index.
+"""
+import math
+
+from .cards import CARDS, RANKS
+
+
+class CountSystem:
+    """Per-rank tags (in ``RANKS`` order) plus the derived per-code tags."""
+
+    __slots__ = ("name", "rank_weights", "code_weights", "balanced")
+
+    def __init__(self, name: str, rank_weights):
+        self.name = name
+        self.rank_weights = tuple(rank_weights)
+        self.code_weights = tuple(self.rank_weights[code >> 2] for code in range(len(CARDS)))
+        self.balanced = sum(self.rank_weights) == 0
+
+    def initial_count(self, num_decks: int) -> int:
+        """Starting running count: 0 for balanced counts, the KO pivot otherwise."""
+        return 0 if self.balanced else -4 * sum(self.rank_weights) * (num_decks - 1)
+
+    def __repr__(self) -> str:
+        return f"CountSystem({self.name!r})"
+
+
+HI_LO = CountSystem("Hi-Lo", [1, 1, 1, 1, 1, 0, 0, 0, -1, -1, -1, -1, -1])
+KO = CountSystem("KO", [1, 1, 1, 1, 1, 1, 0, 0, -1, -1, -1, -1, -1])
+OMEGA_II = CountSystem("Omega II", [1, 1, 2, 2, 2, 1, 0, -1, -2, -2, -2, -2, 0])
+ZEN = CountSystem("Zen", [1, 1, 2, 2, 2, 1, 0, 0, -2, -2, -2, -2, -1])
+SYSTEMS = {s.name: s for s in (HI_LO, KO, OMEGA_II, ZEN)}
+
+# change in player edge (%) from removing one card of each rank from a
+# single deck under basic strategy, used to grade a system's betting
+EFFECTS_OF_REMOVAL = dict(
+    zip(RANKS, [0.38, 0.44, 0.55, 0.69, 0.46, 0.28, 0.0, -0.18, -0.51, -0.51, -0.51, -0.51, -0.61])
+)
+
+
+def correlation(tags, effects) -> float:
+    """Correlation between per-rank ``tags`` and per-rank ``effects`` of removal."""
+    mt, me = sum(tags) / len(tags), sum(effects) / len(effects)
+    cov = sum((t - mt) * (e - me) for t, e in zip(tags, effects))
+    var_t = sum((t - mt) ** 2 for t in tags)
+    var_e = sum((e - me) ** 2 for e in effects)
+    return cov / math.sqrt(var_t * var_e) if var_e else 0.0
+
+
+def betting_correlation(system: CountSystem) -> float:
+    """Correlation between a system's tags and the effects of removal on the edge."""
+    return correlation(system.rank_weights, [EFFECTS_OF_REMOVAL[r] for r in RANKS])
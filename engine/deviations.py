@@ -0,0 +1,121 @@
+# engine/deviations.py
+"""Count-indexed departures from basic strategy."""
+from typing import NamedTuple
+
+from .cards import RANK_VALUES
+from .counting import CountSystem, correlation
+from .exact import hand_evs, remove, shoe_composition
+from .rules import DEFAULT_RULES, Rules
+from .strategy import ACTIONS, DOUBLE, HIT, SPLIT, STAND, BasicStrategy
+
+
+class Deviation(NamedTuple):
+    """Play ``action`` instead of basic strategy once the true count is >= ``index``.
+
+    ``pair`` is the pair card value for split plays, 0 for hard totals.
+    """
+
+    total: int
+    pair: int
+    upcard: int
+    index: int
+    action: int
+
+
+# Hi-Lo indices for multi-deck S17; insurance is left out because the table
+# doesn't offer it, and the 9-total doubles only apply where rules allow them
+ILLUSTRIOUS_18 = (
+    Deviation(16, 0, 10, 0, STAND),
+    Deviation(15, 0, 10, 4, STAND),
+    Deviation(20, 10, 5, 5, SPLIT),
+    Deviation(20, 10, 6, 4, SPLIT),
+    Deviation(10, 0, 10, 4, DOUBLE),
+    Deviation(12, 0, 3, 2, STAND),
+    Deviation(12, 0, 2, 3, STAND),
+    Deviation(11, 0, 11, 1, DOUBLE),
+    Deviation(9, 0, 2, 1, DOUBLE),
+    Deviation(10, 0, 11, 4, DOUBLE),
+    Deviation(9, 0, 7, 3, DOUBLE),
+    Deviation(16, 0, 9, 5, STAND),
+    Deviation(13, 0, 2, -1, STAND),
+    Deviation(12, 0, 4, 0, STAND),
+    Deviation(12, 0, 5, -2, STAND),
+    Deviation(12, 0, 6, -1, STAND),
+    Deviation(13, 0, 3, -2, STAND),
+)
+
+# below the index, the play reverts to whatever the index play replaces
+_BELOW = {STAND: HIT, DOUBLE: HIT, SPLIT: STAND}
+
+
+class DeviationStrategy:
+    """A ``simulate`` strategy that applies ``deviations`` by floored true count.
+
+    Hard-total deviations only fire on hard hands; for plays the table does
+    not cover, ``fallback`` decides (default: basic strategy for ``rules``).
+    Instances pickle, so they can be handed to ``simulate_parallel``.
+    """
+
+    uses_count = True
+
+    def __init__(self, rules: Rules = DEFAULT_RULES, deviations=ILLUSTRIOUS_18, fallback=None):
+        self.rules = rules
+        self.by_hand = {(d.total, d.pair, d.upcard): d for d in deviations}
+        self.fallback = fallback if fallback is not None else BasicStrategy(rules)
+
+    def __call__(self, total, soft, pair, upcard, options, true_count=0) -> str:
+        dev = self.by_hand.get((total, pair, upcard)) if pair else None
+        if dev is None:
+            if pair and self.fallback(total, soft, pair, upcard, options) == "split":
+                return "split"
+            dev = None if soft else self.by_hand.get((total, 0, upcard))
+        if dev is not None:
+            action = ACTIONS[dev.action if true_count >= dev.index else _BELOW[dev.action]]
+            if action in options:
+                return action
+            if action == "double down":
+                return "hit"
+        return self.fallback(total, soft, pair, upcard, options)
+
+
+# ---------------------------------------------------------------------------#
+#                             playing efficiency                             #
+# ---------------------------------------------------------------------------#
+def _cards(dev: Deviation) -> tuple[int, int]:
+    """A two-card hand for ``dev``: the pair, or a hard total without one."""
+    if dev.pair:
+        return dev.pair, dev.pair
+    first = 10 if dev.total >= 12 else dev.total // 2 + 1
+    return first, dev.total - first
+
+
+def decision_effects(dev: Deviation, rules: Rules = DEFAULT_RULES) -> list[float] | None:
+    """Per-rank (``RANKS`` order) change in the gain of ``dev``'s play over the
+    one it replaces when one card of that rank leaves a one-deck shoe, or None
+    where ``rules`` do not allow both plays."""
+    first, second = _cards(dev)
+    play, instead = ACTIONS[dev.action], ACTIONS[_BELOW[dev.action]]
+    deck = shoe_composition(1)
+    left = remove(deck, first, second, dev.upcard)
+
+    def gain(comp):
+        evs = hand_evs(first, second, dev.upcard, comp, rules)
+        return evs[play] - evs[instead] if play in evs and instead in evs else None
+
+    base = gain(deck)
+    if base is None:
+        return None
+    # a value the hand and upcard used up has no card left to remove
+    by_value = {v: gain(remove(deck, v)) - base if left[v - 2] else 0.0 for v in range(2, 12)}
+    return [by_value[v] for v in RANK_VALUES]
+
+
+def playing_efficiency(system: CountSystem, deviations=ILLUSTRIOUS_18, rules: Rules = DEFAULT_RULES) -> float:
+    """Mean correlation between ``system``'s tags and each deviation's
+    ``decision_effects``: how well the count tells when to change a play.
+
+    Decisions are equally weighted, not weighted by how often and how much
+    they gain, so figures run above the published frequency-weighted ones.
+    """
+    effects = [e for e in (decision_effects(d, rules) for d in deviations) if e is not None]
+    return sum(correlation(system.rank_weights, e) for e in effects) / len(effects)
@@ -0,0 +1,380 @@
+# engine/drills.py
+"""Strategy drills: pre-weighted decision scenarios, graded by exact EV.
+
+A scenario is a two-card player hand (card values 2-11, blackjack left
+out), a dealer upcard and a Hi-Lo true count between ``TC_MIN`` and
+``TC_MAX``. A hand is ``(first, second, pair)``: two tens of one rank are
+the splittable pair, two of different ranks (T-J, Q-K, ...) a hard 20, and
+each is weighted by its own rank combinations. All ``SCENARIOS`` of them
+are numbered
+``(hand * 10 + upcard - 2) * len(TRUE_COUNTS) + true_count - TC_MIN`` with
+``hand`` an index into ``HANDS``.
+
+Per ``Rules.key`` there is one drill table, generated offline like the
+strategy tables and stored in ``engine/data``: how often a round starts at
+each true count (from a basic-strategy simulation), then the exact EV of
+every action in every scenario (``nan`` where the action is not allowed),
+computed on a shoe skewed to the scenario's count. Generating one takes a
+few minutes per true count, so only the default rules' table ships; generate
+others with e.g. ``python -m engine.drills --h17`` (the options of
+``add_rules_arguments``, after the matching strategy table).
+
+A ``DrillPool`` weights every scenario by how often it is dealt at a real
+table and draws a large batch at a time, so serving the next drill is a
+list index. ``DrillStats`` keeps per-scenario attempts, correct answers and
+EV lost in one small fixed-size file.
+"""
+import math
+import os
+import random
+from array import array
+from itertools import accumulate
+from typing import NamedTuple
+
+from .cards import Hand
+from .exact import DATA_DIR, UPCARDS, hand_evs, shoe_composition
+from .rules import DEFAULT_RULES, Rules, add_rules_arguments, rules_arguments, rules_from_arguments
+from .simulate import simulate
+from .strategy import BasicStrategy
+
+ACTIONS = ("hit", "stand", "split", "double down", "surrender")  # hand_options order
+# the unsplittable hard 20 comes last, so earlier scenarios keep their numbers
+HANDS = tuple((a, b, a == b) for a in range(2, 12) for b in range(a, 12) if a + b != 21) + ((10, 10, False),)
+TC_MIN, TC_MAX = -3, 6
+TRUE_COUNTS = tuple(range(TC_MIN, TC_MAX + 1))
+SCENARIOS = len(HANDS) * len(UPCARDS) * len(TRUE_COUNTS)
+FOCUS = ("frequency", "deviations", "weak")
+POOL_SIZE = 4096  # scenarios drawn per batch
+TC_HANDS = 1_000_000  # simulated rounds behind the true-count frequencies
+TOLERANCE = 1e-6  # EV differences below this are ties
+
+_tables: dict[str, array] = {}  # by Rules.key
+
+
+def scenario_index(hand: int, upcard: int, true_count: int) -> int:
+    return (hand * len(UPCARDS) + upcard - 2) * len(TRUE_COUNTS) + true_count - TC_MIN
+
+
+def count_composition(true_count: int, num_decks: int) -> tuple[int, ...]:
+    """A ``num_decks`` shoe at ``true_count``: low cards (2-6) traded for
+    high ones (tens and aces, four to one) as evenly as whole cards allow."""
+    counts = list(shoe_composition(num_decks))
+    step = 1 if true_count > 0 else -1
+    for i in range(round(abs(true_count) * num_decks / 2)):
+        low, high = i % 5, 9 if i % 5 == 4 else 8
+        counts[low] -= step
+        counts[high] += step
+    return tuple(counts)
+
+
+def deal_probability(first: int, second: int, upcard: int, comp: tuple[int, ...], pair: bool = True) -> float:
+    """Chance that ``comp`` deals the hand (either order) and the upcard, and
+    the dealer's hole card doesn't make a blackjack.
+
+    Two tens are a ``pair`` only when they share a rank; ``comp`` counts
+    ten-value cards together, a quarter of them per rank.
+    """
+    counts = list(comp)
+    p = 1.0 if first == second else 2.0
+    for n, v in enumerate((first, second, upcard)):
+        p *= counts[v - 2] / (sum(comp) - n)
+        counts[v - 2] -= 1
+    if first == second == 10:
+        tens = comp[8]  # the second ten: of the first one's rank, or not
+        p *= (tens / 4 - 1 if pair else tens * 3 / 4) / (tens - 1)
+    if upcard >= 10:
+        p *= 1 - counts[21 - upcard - 2] / (sum(comp) - 3)
+    return p
+
+
+# ---------------------------------------------------------------------------#
+#                             offline generation                             #
+# ---------------------------------------------------------------------------#
+def _count_block(true_count: int, rules: Rules) -> array:
+    """EVs of every action for every hand and upcard at one true count."""
+    comp = count_composition(true_count, rules.num_decks)
+    block = array("f")
+    for first, second, pair in HANDS:
+        for up in UPCARDS:
+            evs = hand_evs(first, second, up, comp, rules)
+            if not pair:
+                evs.pop("split", None)
+            block.extend(evs.get(action, math.nan) for action in ACTIONS)
+    return block
+
+
+def build_table(rules: Rules = DEFAULT_RULES, workers: int | None = None) -> array:
+    from concurrent.futures import ProcessPoolExecutor  # only generation needs a pool
+
+    from .bankroll import count_table
+
+    freqs = count_table(simulate(rules, BasicStrategy(rules), TC_HANDS, seed=0))
+    table = array("f", (freqs[tc].frequency if tc in freqs else 0.0 for tc in TRUE_COUNTS))
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        blocks = [_count_block(tc, rules) for tc in TRUE_COUNTS]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(TRUE_COUNTS))) as pool:
+            blocks = list(pool.map(_count_block, TRUE_COUNTS, [rules] * len(TRUE_COUNTS)))
+    # blocks are by count; scenarios are numbered count-last
+    per_count = len(HANDS) * len(UPCARDS) * len(ACTIONS)
+    for cell in range(0, per_count, len(ACTIONS)):
+        for block in blocks:
+            table.extend(block[cell : cell + len(ACTIONS)])
+    return table
+
+
+def _path(rules: Rules) -> str:
+    return os.path.join(DATA_DIR, f"drills_{rules.key}.bin")
+
+
+def save_table(rules: Rules = DEFAULT_RULES, workers: int | None = None) -> str:
+    table = build_table(rules, workers)
+    os.makedirs(DATA_DIR, exist_ok=True)
+    with open(_path(rules), "wb") as f:
+        table.tofile(f)
+    return _path(rules)
+
+
+def load_table(rules: Rules = DEFAULT_RULES) -> array:
+    """The drill table for ``rules``, read once and then kept in memory.
+
+    Tables are never built here: a missing one raises ``FileNotFoundError``
+    naming the command that generates it.
+    """
+    table = _tables.get(rules.key)
+    if table is None:
+        table = array("f")
+        try:
+            with open(_path(rules), "rb") as f:
+                table.frombytes(f.read())
+        except FileNotFoundError:
+            command = f"python -m engine.drills {rules_arguments(rules)}".rstrip()
+            raise FileNotFoundError(f"no drill table for rules {rules.key}; generate it with `{command}`") from None
+        if len(table) != len(TRUE_COUNTS) + SCENARIOS * len(ACTIONS):
+            raise ValueError(f"{_path(rules)} is not a drill table (regenerate it)")
+        _tables[rules.key] = table
+    return table
+
+
+# ---------------------------------------------------------------------------#
+#                                 scenarios                                  #
+# ---------------------------------------------------------------------------#
+class Scenario(NamedTuple):
+    index: int
+    first: int
+    second: int
+    upcard: int
+    true_count: int
+    pair: bool
+
+    @classmethod
+    def at(cls, index: int) -> "Scenario":
+        rest, tc = divmod(index, len(TRUE_COUNTS))
+        hand, up = divmod(rest, len(UPCARDS))
+        first, second, pair = HANDS[hand]
+        return cls(index, first, second, up + 2, tc + TC_MIN, pair)
+
+    @property
+    def kind(self) -> str:
+        if self.pair:
+            return "pair"
+        return "soft" if 11 in (self.first, self.second) else "hard"
+
+
+class Grade(NamedTuple):
+    action: str
+    best: str
+    loss: float  # EV given up by ``action``, in initial bets
+
+    @property
+    def correct(self) -> bool:
+        return self.loss <= TOLERANCE
+
+
+def _value_rank(value: int, rng) -> int:
+    """The rank of a card of ``value``, picking a ten's rank at random."""
+    return value - 2 if value < 10 else 12 if value == 11 else rng.randrange(8, 12)
+
+
+class DrillPool:
+    """An endless supply of ``Scenario``s for ``rules``; ``next(pool)`` serves one.
+
+    Scenarios are weighted by real-world frequency: the exact chance of the
+    deal at their count times how often rounds start at that count.
+    ``focus`` narrows the weighting: "deviations" keeps only scenarios whose
+    best play differs from the same hand at a true count of 0, "weak" scales
+    each scenario by its miss rate in ``stats``. With ``counted=False``
+    every drill is at a true count of 0, i.e. plain basic strategy.
+    """
+
+    def __init__(
+        self,
+        rules: Rules = DEFAULT_RULES,
+        focus: str = "frequency",
+        counted: bool = True,
+        stats: "DrillStats | None" = None,
+        size: int = POOL_SIZE,
+        seed=None,
+    ):
+        if focus not in FOCUS:
+            raise ValueError(f"focus must be one of {FOCUS}, not {focus!r}")
+        self.rules = rules
+        self.focus = focus
+        self.stats = stats
+        self.size = size
+        self.rng = random.Random(seed)
+        self.table = load_table(rules)
+        freqs = self.table[: len(TRUE_COUNTS)] if counted else [tc == 0 for tc in TRUE_COUNTS]
+        comps = [count_composition(tc, rules.num_decks) for tc in TRUE_COUNTS]
+        self.frequency = array("d", bytes(8 * SCENARIOS))
+        for i in range(SCENARIOS):
+            s = Scenario.at(i)
+            t = s.true_count - TC_MIN
+            if freqs[t] and (focus != "deviations" or self.best(s) != self.best(Scenario.at(i - s.true_count))):
+                self.frequency[i] = freqs[t] * deal_probability(s.first, s.second, s.upcard, comps[t], s.pair)
+        if not any(self.frequency):
+            raise ValueError(f"no scenarios to drill for focus={focus!r}, counted={counted}")
+        self._batch: list[int] = []
+
+    def _weights(self):
+        if self.focus != "weak" or self.stats is None:
+            return self.frequency
+        attempts, correct = self.stats.attempts, self.stats.correct
+        return [w * (attempts[i] - correct[i] + 1) / (attempts[i] + 2) for i, w in enumerate(self.frequency)]
+
+    def refill(self) -> None:
+        """Draw the next ``size`` scenarios (weights from ``stats`` are re-read)."""
+        cum = list(accumulate(self._weights()))
+        self._batch = self.rng.choices(range(SCENARIOS), cum_weights=cum, k=self.size)
+        self._batch.reverse()
+
+    def __iter__(self) -> "DrillPool":
+        return self
+
+    def __next__(self) -> Scenario:
+        if not self._batch:
+            self.refill()
+        return Scenario.at(self._batch.pop())
+
+    # ----- grading ------------------------------------------------------------
+    def evs(self, scenario: Scenario) -> dict[str, float]:
+        """EV of every legal action, in initial bets."""
+        base = len(TRUE_COUNTS) + scenario.index * len(ACTIONS)
+        row = self.table[base : base + len(ACTIONS)]
+        return {action: ev for action, ev in zip(ACTIONS, row) if not math.isnan(ev)}
+
+    def options(self, scenario: Scenario) -> list[str]:
+        return list(self.evs(scenario))
+
+    def best(self, scenario: Scenario) -> str:
+        evs = self.evs(scenario)
+        return max(evs, key=evs.get)
+
+    def grade(self, scenario: Scenario, action: str) -> Grade:
+        """Score ``action`` against the best play; records it in ``stats``, if any."""
+        evs = self.evs(scenario)
+        if action not in evs:
+            raise ValueError(f"{action!r} is not an option here")
+        best = max(evs, key=evs.get)
+        grade = Grade(action, best, evs[best] - evs[action])
+        if self.stats is not None:
+            self.stats.record(scenario.index, grade)
+        return grade
+
+    def cards(self, scenario: Scenario) -> tuple[Hand, int]:
+        """The scenario as cards to show: the player's ``Hand`` and the upcard's code."""
+        rng = self.rng
+        first, second = scenario.first, scenario.second
+        if rng.random() < 0.5:
+            first, second = second, first
+        ranks = [_value_rank(first, rng)]
+        if scenario.pair:
+            ranks.append(ranks[0])
+        elif first == second:  # a hard 20: two tens of different ranks
+            ranks.append(rng.choice([rank for rank in range(8, 12) if rank != ranks[0]]))
+        else:
+            ranks.append(_value_rank(second, rng))
+        hand = Hand(rank * 4 + rng.randrange(4) for rank in ranks)
+        return hand, _value_rank(scenario.upcard, rng) * 4 + rng.randrange(4)
+
+
+# ---------------------------------------------------------------------------#
+#                                  accuracy                                  #
+# ---------------------------------------------------------------------------#
+class DrillStats:
+    """Per-scenario attempts, correct answers and total EV lost.
+
+    On disk these are three columns of ``SCENARIOS`` values (``I``, ``I``,
+    ``f``) back to back, a fixed 12 bytes per scenario. A file from before
+    scenarios were appended to ``HANDS`` is read as far as it goes. Without
+    a ``path`` the stats live only in memory. ``save`` (or ``close``) writes
+    them back.
+    """
+
+    def __init__(self, path: str | None = None):
+        self.path = path
+        self.attempts = array("I", bytes(4 * SCENARIOS))
+        self.correct = array("I", bytes(4 * SCENARIOS))
+        self.loss = array("f", bytes(4 * SCENARIOS))
+        if path and os.path.exists(path):
+            with open(path, "rb") as f:
+                data = f.read()
+            n = len(data) // 12
+            if len(data) % 12 or not n or n > SCENARIOS or n % (len(UPCARDS) * len(TRUE_COUNTS)):
+                raise ValueError(f"{path} is not a drill stats file (size {len(data)})")
+            for i, col in enumerate((self.attempts, self.correct, self.loss)):
+                col[:n] = array(col.typecode, data[4 * n * i : 4 * n * (i + 1)])
+
+    def record(self, index: int, grade: Grade) -> None:
+        self.attempts[index] += 1
+        self.correct[index] += grade.correct
+        self.loss[index] += grade.loss
+
+    def summary(self, indices=None) -> tuple[int, int, float]:
+        """Attempts, correct answers and EV lost over ``indices`` (default all)."""
+        indices = range(SCENARIOS) if indices is None else indices
+        return (
+            sum(self.attempts[i] for i in indices),
+            sum(self.correct[i] for i in indices),
+            sum(self.loss[i] for i in indices),
+        )
+
+    def by_kind(self) -> dict[str, tuple[int, int, float]]:
+        """``summary`` for hard totals, soft totals and pairs."""
+        kinds: dict[str, list[int]] = {"hard": [], "soft": [], "pair": []}
+        for i in range(SCENARIOS):
+            if self.attempts[i]:
+                kinds[Scenario.at(i).kind].append(i)
+        return {kind: self.summary(indices) for kind, indices in kinds.items()}
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        tmp = self.path + ".tmp"
+        with open(tmp, "wb") as f:
+            for col in (self.attempts, self.correct, self.loss):
+                col.tofile(f)
+        os.replace(tmp, self.path)
+
+    def close(self) -> None:
+        self.save()
+
+    def __enter__(self) -> "DrillStats":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def stats_path(rules: Rules = DEFAULT_RULES) -> str:
+    """Where the front-ends keep a player's drill stats for ``rules``."""
+    return os.path.join(os.path.expanduser("~"), f".blackjack_drills_{rules.key}.bin")
+
+
+if __name__ == "__main__":
+    import argparse  # only the generator needs it
+
+    parser = argparse.ArgumentParser(description="Generate the drill table for a rule set.")
+    add_rules_arguments(parser)
+    print(save_table(rules_from_arguments(parser.parse_args())))
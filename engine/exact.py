@@ -0,0 +1,226 @@
+# engine/exact.py
+"""Exact, composition-dependent dealer probabilities and player EVs.
+
+A composition is a tuple of remaining card counts by value: index 0 is a 2,
+index 8 a ten-value card and index 9 an ace. Every recursion is memoized on
+(hand state, composition) behind a bounded LRU cache. Player EVs are in units
+of the initial bet, assume the dealer peeks (so they are conditional on the
+dealer not holding blackjack) and follow a ``Rules``: whether the dealer hits
+soft 17, which two-card totals may double and whether doubling after a split
+is allowed. Split hands are played once (no re-split).
+"""
+import os
+from array import array
+from functools import lru_cache
+
+from .cards import NUM_DECKS
+from .rules import DEFAULT_RULES, Rules
+
+DEALER_OUTCOMES = ("17", "18", "19", "20", "21", "blackjack", "bust")
+BLACKJACK, BUST = 5, 6
+UPCARDS = tuple(range(2, 12))
+CACHE_SIZE = 1 << 18
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+
+
+# ---------------------------------------------------------------------------#
+#                               compositions                                 #
+# ---------------------------------------------------------------------------#
+def shoe_composition(num_decks: int = NUM_DECKS) -> tuple[int, ...]:
+    return (4 * num_decks,) * 8 + (16 * num_decks, 4 * num_decks)
+
+
+def remove(comp: tuple[int, ...], *values: int) -> tuple[int, ...]:
+    """``comp`` with one card of each value (2-11) taken out."""
+    counts = list(comp)
+    for v in values:
+        if not counts[v - 2]:
+            raise ValueError(f"no {v} left in the composition")
+        counts[v - 2] -= 1
+    return tuple(counts)
+
+
+def _add(total: int, soft: bool, value: int) -> tuple[int, bool]:
+    total += value
+    aces = soft + (value == 11)
+    while total > 21 and aces:
+        total -= 10
+        aces -= 1
+    return total, aces > 0
+
+
+# ---------------------------------------------------------------------------#
+#                                  dealer                                    #
+# ---------------------------------------------------------------------------#
+@lru_cache(maxsize=CACHE_SIZE)
+def _dealer(total: int, soft: bool, comp: tuple[int, ...], h17: bool = False) -> tuple[float, ...]:
+    if total > 21:
+        return (0.0,) * 6 + (1.0,)
+    if total >= 17 and not (h17 and soft and total == 17):
+        return tuple(1.0 if i == total - 17 else 0.0 for i in range(7))
+    n = sum(comp)
+    acc = [0.0] * 7
+    for i, c in enumerate(comp):
+        if c:
+            p = c / n
+            nt, ns = _add(total, soft, i + 2)
+            sub = _dealer(nt, ns, comp[:i] + (c - 1,) + comp[i + 1 :], h17)
+            for k in range(7):
+                acc[k] += p * sub[k]
+    return tuple(acc)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def dealer_probabilities(
+    upcard: int, comp: tuple[int, ...], peek: bool = False, h17: bool = False
+) -> tuple[float, ...]:
+    """P(dealer finishes on each of ``DEALER_OUTCOMES``) given the upcard.
+
+    ``comp`` excludes the upcard. With ``peek`` the result is conditional on
+    the dealer not having blackjack; ``h17`` makes the dealer hit soft 17.
+    """
+    acc = [0.0] * 7
+    weight = 0
+    for i, c in enumerate(comp):
+        if not c:
+            continue
+        hole = i + 2
+        if upcard + hole == 21:
+            if not peek:
+                acc[BLACKJACK] += c
+                weight += c
+            continue
+        total, soft = _add(upcard, upcard == 11, hole)
+        sub = _dealer(total, soft, comp[:i] + (c - 1,) + comp[i + 1 :], h17)
+        for k in range(7):
+            acc[k] += c * sub[k]
+        weight += c
+    return tuple(a / weight for a in acc)
+
+
+# ---------------------------------------------------------------------------#
+#                                  player                                    #
+# ---------------------------------------------------------------------------#
+def stand_ev(total: int, upcard: int, comp: tuple[int, ...], h17: bool = False) -> float:
+    if total > 21:
+        return -1.0
+    probs = dealer_probabilities(upcard, comp, True, h17)
+    ev = probs[BUST]
+    for i in range(5):
+        dealer = 17 + i
+        if total > dealer:
+            ev += probs[i]
+        elif total < dealer:
+            ev -= probs[i]
+    return ev
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def hit_ev(total: int, soft: bool, upcard: int, comp: tuple[int, ...], h17: bool = False) -> float:
+    """EV of hitting now and then playing on optimally (hit or stand)."""
+    n = sum(comp)
+    ev = 0.0
+    for i, c in enumerate(comp):
+        if c:
+            nt, ns = _add(total, soft, i + 2)
+            if nt > 21:
+                ev -= c / n
+                continue
+            rest = comp[:i] + (c - 1,) + comp[i + 1 :]
+            best = stand_ev(nt, upcard, rest, h17)
+            if nt < 21:
+                best = max(best, hit_ev(nt, ns, upcard, rest, h17))
+            ev += c / n * best
+    return ev
+
+
+def double_ev(total: int, soft: bool, upcard: int, comp: tuple[int, ...], h17: bool = False) -> float:
+    n = sum(comp)
+    ev = 0.0
+    for i, c in enumerate(comp):
+        if c:
+            nt, _ = _add(total, soft, i + 2)
+            ev += c / n * stand_ev(nt, upcard, comp[:i] + (c - 1,) + comp[i + 1 :], h17)
+    return 2 * ev
+
+
+def split_ev(pair: int, upcard: int, comp: tuple[int, ...], rules: Rules = DEFAULT_RULES) -> float:
+    """Two hands, each one ``pair`` card plus a draw, played without re-splitting.
+
+    ``comp`` excludes both pair cards and the upcard.
+    """
+    h17 = rules.hit_soft_17
+    double_totals = rules.double_totals if rules.double_after_split else ()
+    stiff_aces = pair == 11 and not rules.hit_split_aces
+    n = sum(comp)
+    ev = 0.0
+    for i, c in enumerate(comp):
+        if c:
+            total, soft = _add(pair, pair == 11, i + 2)
+            rest = comp[:i] + (c - 1,) + comp[i + 1 :]
+            best = stand_ev(total, upcard, rest, h17)
+            if total < 21 and not stiff_aces:
+                best = max(best, hit_ev(total, soft, upcard, rest, h17))
+                if total in double_totals:
+                    best = max(best, double_ev(total, soft, upcard, rest, h17))
+            ev += c / n * best
+    return 2 * ev
+
+
+def hand_evs(first: int, second: int, upcard: int, comp=None, rules: Rules = DEFAULT_RULES) -> dict[str, float]:
+    """EV of every legal action for a two-card hand (card values 2-11).
+
+    ``comp`` is the shoe before these three cards were dealt (default: a full
+    shoe of ``rules.num_decks``).
+    """
+    comp = remove(comp if comp is not None else shoe_composition(rules.num_decks), first, second, upcard)
+    h17 = rules.hit_soft_17
+    total, soft = _add(first, first == 11, second)
+    evs = {"stand": stand_ev(total, upcard, comp, h17)}
+    if total < 21:
+        evs["hit"] = hit_ev(total, soft, upcard, comp, h17)
+        if total in rules.double_totals:
+            evs["double down"] = double_ev(total, soft, upcard, comp, h17)
+    if first == second:
+        evs["split"] = split_ev(first, upcard, comp, rules)
+    if rules.surrender:
+        evs["surrender"] = -0.5
+    return evs
+
+
+def clear_cache() -> None:
+    for fn in (_dealer, dealer_probabilities, hit_ev):
+        fn.cache_clear()
+
+
+# ---------------------------------------------------------------------------#
+#                       persisted full-shoe dealer table                     #
+# ---------------------------------------------------------------------------#
+def _table_path(num_decks: int, h17: bool) -> str:
+    return os.path.join(DATA_DIR, f"dealer_{num_decks}d{'_h17' if h17 else ''}.bin")
+
+
+def build_dealer_table(num_decks: int = NUM_DECKS, h17: bool = False) -> array:
+    """Full-shoe dealer probabilities, flattened as [upcard][peek][outcome]."""
+    full = shoe_composition(num_decks)
+    table = array("d")
+    for up in UPCARDS:
+        for peek in (False, True):
+            table.extend(dealer_probabilities(up, remove(full, up), peek, h17))
+    return table
+
+
+def full_shoe_table(num_decks: int = NUM_DECKS, h17: bool = False) -> dict[tuple[int, bool], tuple[float, ...]]:
+    """``{(upcard, peek): probabilities}`` for a fresh shoe, read from disk once built."""
+    path = _table_path(num_decks, h17)
+    table = array("d")
+    try:
+        with open(path, "rb") as f:
+            table.frombytes(f.read())
+    except OSError:
+        table = build_dealer_table(num_decks, h17)
+        os.makedirs(DATA_DIR, exist_ok=True)
+        with open(path, "wb") as f:
+            table.tofile(f)
+    keys = [(up, peek) for up in UPCARDS for peek in (False, True)]
+    return {key: tuple(table[7 * i : 7 * i + 7]) for i, key in enumerate(keys)}
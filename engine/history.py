@@ -0,0 +1,286 @@
+# engine/history.py
+"""Append-only binary hand history.
+
+Every settled hand, dealer included, is one fixed-width little-endian
+``RECORD`` of ``RECORD_SIZE`` bytes, so hand ``i`` sits at byte
+``i * RECORD_SIZE`` and a log can be memory-mapped and indexed directly.
+Records are written in round order; a round's hands are adjacent, dealer
+first, so ``HistoryLog.round`` finds one by binary search.
+
+A record carries enough to audit or replay its hand: the shoe's seed and
+its checkpoint at the start of the round (shuffle number and position),
+the cut, the cards in deal order, the player's decisions (how often the
+hand was split while it was being played, then every card past the second
+is a hit, or the double-down card; surrender is a flag) and the bet and net
+result as settled by ``compare_hand``. The dealer's record has no bet; it
+holds the shoe's ``batch`` instead, since batch shuffles differ from the
+default ones. ``replay`` re-deals a logged round from its checkpoint alone.
+"""
+import mmap
+import os
+import struct
+from array import array
+from bisect import bisect_left
+from typing import NamedTuple
+
+from .arena import DOUBLED, SPLIT, SURRENDERED
+from .cards import Outcome
+from .rules import DEFAULT_RULES, Rules
+from .shoe import Shoe, ShoeState
+from .table import Round, Table
+
+MAX_CARDS = 22  # 21 aces and a bust card: the most any hand can hold
+RECORD = struct.Struct(f"<QQIHHBBBBidB{MAX_CARDS}sB")
+RECORD_SIZE = RECORD.size  # 64
+DEALER = 0xFF  # ``outcome`` of the dealer's record
+READ_RECORDS = 16384  # records per read when streaming from a file
+
+
+class HandRecord(NamedTuple):
+    round: int
+    seed: int
+    shuffle: int  # ShoeState.shuffles at the start of the round
+    cut: int
+    start: int  # ShoeState.curr: shoe position of the round's first card
+    hand: int  # 0 for the dealer, else the hand's 1-based place in play order
+    player: int  # 0 for the dealer
+    flags: int  # HandArena.flags: SPLIT | DOUBLED | SURRENDERED
+    outcome: int  # an Outcome, or DEALER
+    bet: int  # the dealer's record: the shoe's batch size (0: default shuffles)
+    net: float
+    ncards: int
+    cards: bytes  # card codes, padded to MAX_CARDS
+    splits: int  # HandArena.splits
+
+    @property
+    def codes(self) -> bytes:
+        return self.cards[: self.ncards]
+
+    @property
+    def batch(self) -> int:
+        """The ``Shoe(batch=)`` the round was dealt from (kept on the dealer's record)."""
+        return self.bet if self.outcome == DEALER else 0
+
+
+def _unpack(buf, offset: int = 0) -> HandRecord:
+    return HandRecord._make(RECORD.unpack_from(buf, offset))
+
+
+# ---------------------------------------------------------------------------#
+#                                   writing                                  #
+# ---------------------------------------------------------------------------#
+class HistoryWriter:
+    """Appends each finished ``Round`` to ``path``; pass it to ``Table(history=)``.
+
+    Records are buffered and written ``flush_every`` at a time (and on
+    ``close``). Round numbers continue from the last record already there.
+    """
+
+    def __init__(self, path: str, flush_every: int = 4096):
+        self.path = path
+        self.flush_every = flush_every
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        if size % RECORD_SIZE:
+            raise ValueError(f"{path} is not a hand history (size {size})")
+        self.rounds = 0
+        if size:
+            with open(path, "rb") as f:
+                f.seek(size - RECORD_SIZE)
+                self.rounds = _unpack(f.read(RECORD_SIZE)).round + 1
+        self._file = open(path, "ab")
+        self._buf = bytearray()
+        self._pending = 0
+
+    def record(self, rnd) -> None:
+        shoe = rnd.table.shoe
+        head = (self.rounds, shoe.seed, rnd.checkpoint.shuffles, shoe.cut, rnd.checkpoint.curr)
+        dealer, arena = rnd.dealer, rnd.arena
+        self._buf += RECORD.pack(*head, 0, 0, 0, DEALER, shoe.batch, 0.0, len(dealer), bytes(dealer.cards), 0)
+        payouts = rnd.config.payouts
+        for i, s in enumerate(arena.order(), start=1):
+            outcome, bet, cards = arena.outcome[s], arena.bet[s], arena.hand[s].cards
+            self._buf += RECORD.pack(
+                *head,
+                i,
+                arena.player[s],
+                arena.flags[s],
+                outcome,
+                bet,
+                bet * payouts[outcome],
+                len(cards),
+                bytes(cards),
+                arena.splits[s],
+            )
+        self.rounds += 1
+        self._pending += 1
+        if self._pending >= self.flush_every:
+            self.flush()
+
+    def flush(self) -> None:
+        self._file.write(self._buf)
+        self._file.flush()
+        self._buf.clear()
+        self._pending = 0
+
+    def close(self) -> None:
+        self.flush()
+        self._file.close()
+
+    def __enter__(self) -> "HistoryWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+# ---------------------------------------------------------------------------#
+#                                   reading                                  #
+# ---------------------------------------------------------------------------#
+def read_history(path: str, start: int = 0):
+    """Stream ``HandRecord``s from hand ``start`` on, a block at a time."""
+    with open(path, "rb") as f:
+        f.seek(start * RECORD_SIZE)
+        while block := f.read(READ_RECORDS * RECORD_SIZE):
+            for fields in RECORD.iter_unpack(block):
+                yield HandRecord._make(fields)
+
+
+class HistoryLog:
+    """A memory-mapped log: ``log[i]`` is hand ``i`` and ``log.round(n)``
+    the hands of round ``n``, both without reading anything else."""
+
+    def __init__(self, path: str):
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        if size % RECORD_SIZE:
+            raise ValueError(f"{path} is not a hand history (size {size})")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        self._len = size // RECORD_SIZE
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __getitem__(self, i: int) -> HandRecord:
+        if i < 0:
+            i += self._len
+        if not 0 <= i < self._len:
+            raise IndexError(i)
+        return _unpack(self._map, i * RECORD_SIZE)
+
+    def __iter__(self):
+        for i in range(self._len):
+            yield _unpack(self._map, i * RECORD_SIZE)
+
+    def _round_at(self, i: int) -> int:
+        return struct.unpack_from("<Q", self._map, i * RECORD_SIZE)[0]
+
+    def round(self, n: int) -> list[HandRecord]:
+        """Round ``n``'s hands, dealer first (empty if it isn't in the log)."""
+        lo = bisect_left(range(self._len), n, key=self._round_at)
+        hands = []
+        while lo < self._len and self._round_at(lo) == n:
+            hands.append(self[lo])
+            lo += 1
+        return hands
+
+    def close(self) -> None:
+        if self._len:
+            self._map.close()
+        self._file.close()
+
+    def __enter__(self) -> "HistoryLog":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+# ---------------------------------------------------------------------------#
+#                                   replay                                   #
+# ---------------------------------------------------------------------------#
+def replay(records: list[HandRecord], rules: Rules = DEFAULT_RULES) -> Round:
+    """Re-deal a logged round (``HistoryLog.round(n)``) and re-apply its decisions.
+
+    The shoe is rebuilt from the seed and restored to the round's checkpoint,
+    so nothing before the round is dealt again. Compare the returned round's
+    ``outcomes`` and ``net`` with the log to audit a payout. ``rules`` must be
+    the rules the round was played under.
+    """
+    dealer, hands = records[0], records[1:]
+    shoe = Shoe(rules.num_decks, seed=dealer.seed, penetration=rules.penetration, batch=dealer.batch)
+    shoe.restore(ShoeState(dealer.shuffle, dealer.start))
+    num_players = max(h.player for h in hands)
+    table = Table(num_players, shoe=shoe, min_bet=0, starting_chips=1 << 40, rules=rules)
+    for h in hands:
+        if not h.flags & SPLIT or table.bets[h.player - 1] == 0:
+            table.bets[h.player - 1] = h.bet // 2 if h.flags & DOUBLED else h.bet
+    rnd = Round(table)
+
+    split_done = [0] * len(hands)
+    while rnd.active:
+        t = rnd.turn
+        rec = hands[t - 1]
+        if split_done[t - 1] < rec.splits:
+            split_done[t - 1] += 1
+            action = "split"
+        elif rec.flags & SURRENDERED:
+            action = "surrender"
+        elif rec.flags & DOUBLED:
+            action = "double down"
+        else:
+            action = "hit" if len(rnd.current) < rec.ncards else "stand"
+        rnd.act(action)
+    rnd.finish()
+    return rnd
+
+
+# ---------------------------------------------------------------------------#
+#                               columnar export                              #
+# ---------------------------------------------------------------------------#
+# typecode per numeric HandRecord field; cards are exported as a flat byte
+# column of MAX_CARDS per hand
+COLUMNS = {
+    "round": "Q",
+    "seed": "Q",
+    "shuffle": "I",
+    "cut": "H",
+    "start": "H",
+    "hand": "B",
+    "player": "B",
+    "flags": "B",
+    "outcome": "B",
+    "bet": "i",
+    "net": "d",
+    "ncards": "B",
+    "splits": "B",
+}
+
+
+def columns(path: str) -> dict[str, array]:
+    """The whole log as one typed ``array`` per field, plus ``cards``."""
+    cols = {name: array(code) for name, code in COLUMNS.items()}
+    cols["cards"] = array("B")
+    fields = [(HandRecord._fields.index(name), cols[name].append) for name in COLUMNS]
+    cards = cols["cards"].frombytes
+    for record in read_history(path):
+        for i, append in fields:
+            append(record[i])
+        cards(record.cards)
+    return cols
+
+
+def export_columns(path: str, directory: str) -> list[str]:
+    """Write each column of ``path`` to ``directory/<field>.bin`` as raw
+    native-order values (``numpy.fromfile(f, dtype)`` reads them back)."""
+    os.makedirs(directory, exist_ok=True)
+    written = []
+    for name, col in columns(path).items():
+        out = os.path.join(directory, f"{name}.bin")
+        with open(out, "wb") as f:
+            col.tofile(f)
+        written.append(out)
+    return written
+
+
+def outcome_name(record: HandRecord) -> str:
+    return "dealer" if record.outcome == DEALER else Outcome(record.outcome).name
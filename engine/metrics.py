@@ -0,0 +1,119 @@
+# engine/metrics.py
+"""Opt-in counters, per-phase timers and round hooks.
+
+Pass a ``Metrics`` to ``Table(metrics=)``. Each round the table deals is
+then either sampled, and played by an instrumented ``Round`` that times its
+phases, counts its events and calls the hooks, or played by a plain
+``Round`` with no instrumentation at all. ``Metrics(sample=100)`` samples
+one round in a hundred; a table without metrics pays nothing.
+
+Front-ends time their own phases (e.g. ``render``) with ``add_time`` or
+``timer``, so engine time and drawing time show up separately.
+"""
+from contextlib import contextmanager
+from time import perf_counter_ns
+
+
+class Metrics:
+    """Counters (name -> int), timers (phase -> [calls, total ns, max ns])
+    and hooks ``hook(event, rnd)``, shared by any number of tables."""
+
+    def __init__(self, sample: int = 1):
+        if sample < 1:
+            raise ValueError(f"sample must be at least 1, not {sample}")
+        self.sample = sample
+        self.rounds = 0  # rounds dealt, sampled or not
+        self.sampled_rounds = 0
+        self.counters: dict[str, int] = {}
+        self.timers: dict[str, list[int]] = {}
+        self.hooks = []
+
+    def sampled(self) -> bool:
+        """Whether the round being dealt is instrumented (the first of every ``sample``)."""
+        self.rounds += 1
+        if (self.rounds - 1) % self.sample:
+            return False
+        self.sampled_rounds += 1
+        return True
+
+    # ----- recording --------------------------------------------------------
+    def count(self, name: str, n: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def add_time(self, phase: str, ns: int) -> None:
+        timer = self.timers.get(phase)
+        if timer is None:
+            self.timers[phase] = [1, ns, ns]
+        else:
+            timer[0] += 1
+            timer[1] += ns
+            if ns > timer[2]:
+                timer[2] = ns
+
+    @contextmanager
+    def timer(self, phase: str):
+        start = perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.add_time(phase, perf_counter_ns() - start)
+
+    # ----- hooks ------------------------------------------------------------
+    def subscribe(self, hook):
+        """Call ``hook(event, rnd)`` on every sampled round's events:
+        "dealt", each action ("hit", "stand", "split", "double_down",
+        "surrender") and "settled". Returns ``hook``, so it works as a decorator."""
+        self.hooks.append(hook)
+        return hook
+
+    def emit(self, event: str, rnd) -> None:
+        for hook in self.hooks:
+            hook(event, rnd)
+
+    # ----- export -----------------------------------------------------------
+    def reset(self) -> None:
+        self.rounds = self.sampled_rounds = 0
+        self.counters.clear()
+        self.timers.clear()
+
+    def snapshot(self) -> dict:
+        """Everything recorded so far as plain data; times in seconds."""
+        return {
+            "rounds": self.rounds,
+            "sampled_rounds": self.sampled_rounds,
+            "counters": dict(self.counters),
+            "timers": {
+                phase: {"calls": calls, "seconds": total / 1e9, "max_seconds": most / 1e9}
+                for phase, (calls, total, most) in self.timers.items()
+            },
+        }
+
+    def prometheus(self, prefix: str = "blackjack") -> str:
+        """The snapshot in Prometheus' text exposition format."""
+        lines = [
+            f"# HELP {prefix}_rounds_total Rounds dealt.",
+            f"# TYPE {prefix}_rounds_total counter",
+            f"{prefix}_rounds_total {self.rounds}",
+            f"# HELP {prefix}_sampled_rounds_total Rounds instrumented.",
+            f"# TYPE {prefix}_sampled_rounds_total counter",
+            f"{prefix}_sampled_rounds_total {self.sampled_rounds}",
+            f"# HELP {prefix}_events_total Events in sampled rounds.",
+            f"# TYPE {prefix}_events_total counter",
+        ]
+        lines += [f'{prefix}_events_total{{event="{name}"}} {n}' for name, n in sorted(self.counters.items())]
+        lines += [
+            f"# HELP {prefix}_phase_seconds Time spent per phase.",
+            f"# TYPE {prefix}_phase_seconds summary",
+        ]
+        for phase, (calls, total, _) in sorted(self.timers.items()):
+            lines.append(f'{prefix}_phase_seconds_sum{{phase="{phase}"}} {total / 1e9:.9f}')
+            lines.append(f'{prefix}_phase_seconds_count{{phase="{phase}"}} {calls}')
+        lines += [
+            f"# HELP {prefix}_phase_max_seconds Longest single call per phase.",
+            f"# TYPE {prefix}_phase_max_seconds gauge",
+        ]
+        lines += [
+            f'{prefix}_phase_max_seconds{{phase="{phase}"}} {most / 1e9:.9f}'
+            for phase, (_, _, most) in sorted(self.timers.items())
+        ]
+        return "\n".join(lines) + "\n"
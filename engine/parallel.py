@@ -0,0 +1,51 @@
+# engine/parallel.py
+"""Spread ``simulate`` over a process pool.
+
+The run is cut into fixed-size chunks and chunk ``i`` is always played with
+``derive_seed(seed, i)``, so a result depends only on the master seed and
+``n_hands`` -- not on the number of workers or the order chunks finish in.
+Per-chunk results are folded into one ``SimResult`` in chunk order, so even
+the floating-point sums come out bit-for-bit the same.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from .counting import HI_LO, CountSystem
+from .rules import Rules
+from .shoe import derive_seed
+from .simulate import SimResult, simulate
+
+CHUNK_HANDS = 1_000_000
+
+
+def _chunks(n_hands: int, chunk: int):
+    for i, start in enumerate(range(0, n_hands, chunk)):
+        yield i, min(chunk, n_hands - start)
+
+
+def simulate_parallel(
+    rules: Rules | None = None,
+    strategy=None,
+    n_hands: int = 1_000_000,
+    seed=0,
+    workers: int | None = None,
+    chunk: int = CHUNK_HANDS,
+    system: CountSystem = HI_LO,
+) -> SimResult:
+    """``simulate`` across ``workers`` processes (default: every core).
+
+    ``strategy`` must be picklable, i.e. a module-level function.
+    """
+    total = SimResult()
+    jobs = list(_chunks(n_hands, chunk))
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(jobs) == 1:
+        for i, n in jobs:
+            total += simulate(rules, strategy, n, derive_seed(seed, i), system)
+        return total
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+        futures = [pool.submit(simulate, rules, strategy, n, derive_seed(seed, i), system) for i, n in jobs]
+        for future in futures:  # chunk order, not finish order
+            total += future.result()
+    return total
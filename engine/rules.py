@@ -0,0 +1,139 @@
+# engine/rules.py
+"""Table rules as a single immutable value, plus its precomputed lookup tables."""
+from dataclasses import dataclass
+from functools import cached_property
+
+from .cards import NUM_DECKS, PAYOUTS, Hand, Outcome
+from .shoe import PENETRATION
+
+
+@dataclass(frozen=True)
+class Rules:
+    """One table's rules. The defaults are the rules this table has always
+    played: two decks, dealer stands on all 17s, 3:2 blackjack, double on
+    10/11 (also after a split), unlimited splits, no surrender, and a cut
+    between half and two thirds of the shoe."""
+
+    num_decks: int = NUM_DECKS
+    hit_soft_17: bool = False
+    blackjack_payout: float = 1.5
+    double_totals: tuple[int, ...] = (10, 11)
+    double_after_split: bool = True
+    surrender: bool = False
+    max_hands: int = 0  # hands one player may split into; 0 = unlimited
+    resplit_aces: bool = True
+    hit_split_aces: bool = True
+    penetration: tuple[float, float] = PENETRATION
+
+    @cached_property
+    def config(self) -> "RuleConfig":
+        return RuleConfig(self)
+
+    @property
+    def key(self) -> str:
+        """Short name for the rules that change basic strategy, used in file names."""
+        parts = [f"{self.num_decks}d", "h17" if self.hit_soft_17 else "s17"]
+        if not self.double_after_split:
+            parts.append("nodas")
+        if self.double_totals != (10, 11):
+            parts.append("d" + "-".join(map(str, self.double_totals)))
+        if self.surrender:
+            parts.append("ls")
+        if not self.hit_split_aces:
+            parts.append("nohsa")
+        return "_".join(parts)
+
+
+class RuleConfig:
+    """Rules compiled into tables so the engine indexes instead of branching.
+
+    ``dealer_hits[soft][total]`` says whether the dealer draws;
+    ``can_double[split][total]`` whether a two-card ``total`` may double;
+    ``can_resplit[ace]`` and ``can_hit[ace]`` whether a split hand may be
+    split again and hit, ``ace`` being whether it was split from aces;
+    ``payouts[outcome]`` is the bet multiplier for each ``Outcome`` and
+    ``payout_cents[outcome]`` the same in hundredths, for integer chip sums.
+    ``strategy`` is the rules' basic-strategy table once ``engine.strategy``
+    has loaded it.
+    """
+
+    __slots__ = ("dealer_hits", "can_double", "can_resplit", "can_hit", "max_splits", "payouts", "payout_cents", "strategy")
+
+    def __init__(self, rules: Rules):
+        hard = [total < 17 for total in range(32)]
+        soft = [total < 17 or (rules.hit_soft_17 and total == 17) for total in range(32)]
+        self.dealer_hits = (tuple(hard), tuple(soft))
+        first = tuple(total in rules.double_totals for total in range(32))
+        after_split = first if rules.double_after_split else (False,) * 32
+        self.can_double = (first, after_split)
+        self.can_resplit = (True, rules.resplit_aces)
+        self.can_hit = (True, rules.hit_split_aces)
+        self.max_splits = rules.max_hands - 1 if rules.max_hands else 1 << 30
+        payouts = [PAYOUTS[o] for o in Outcome]
+        payouts[Outcome.BLACKJACK] = rules.blackjack_payout
+        self.payouts = tuple(payouts)
+        self.payout_cents = tuple(round(p * 100) for p in payouts)
+        self.strategy = None
+
+
+DEFAULT_RULES = Rules()
+
+
+def hand_options(
+    active_hand: Hand, rules: Rules = DEFAULT_RULES, split: bool = False, can_split: bool = True, can_hit: bool = True
+) -> list[str]:
+    """Legal actions for ``active_hand``; ``split`` marks a hand made by splitting,
+    ``can_split`` is False once its player may not split again and ``can_hit``
+    False for split aces that get one card (they may only stand or re-split)."""
+    opts = ["hit", "stand"] if can_hit else ["stand"]
+    if len(active_hand.cards) != 2:
+        return opts
+    if can_split and active_hand.is_pair:
+        opts.append("split")
+    if not can_hit:
+        return opts
+    if rules.config.can_double[split][active_hand.total]:
+        opts.append("double down")
+    if rules.surrender and not split:
+        opts.append("surrender")
+    return opts
+
+
+# ---------------------------------------------------------------------------#
+#                     rule options for the table generators                  #
+# ---------------------------------------------------------------------------#
+def add_rules_arguments(parser) -> None:
+    """Command-line options for every rule that is part of ``Rules.key``."""
+    parser.add_argument("--decks", type=int, default=NUM_DECKS, help=f"decks in the shoe (default {NUM_DECKS})")
+    parser.add_argument("--h17", action="store_true", help="dealer hits soft 17")
+    parser.add_argument("--no-das", action="store_true", help="no doubling after a split")
+    parser.add_argument("--double", default="10,11", help="two-card totals that may double (default 10,11)")
+    parser.add_argument("--surrender", action="store_true", help="late surrender")
+    parser.add_argument("--no-hit-split-aces", action="store_true", help="split aces get one card each")
+
+
+def rules_from_arguments(args) -> Rules:
+    return Rules(
+        num_decks=args.decks,
+        hit_soft_17=args.h17,
+        double_after_split=not args.no_das,
+        double_totals=tuple(int(t) for t in args.double.split(",")),
+        surrender=args.surrender,
+        hit_split_aces=not args.no_hit_split_aces,
+    )
+
+
+def rules_arguments(rules: Rules) -> str:
+    """The ``add_rules_arguments`` options that select ``rules``' key."""
+    args = [] if rules.num_decks == NUM_DECKS else [f"--decks {rules.num_decks}"]
+    if rules.hit_soft_17:
+        args.append("--h17")
+    if not rules.double_after_split:
+        args.append("--no-das")
+    if rules.double_totals != (10, 11):
+        args.append("--double " + ",".join(map(str, rules.double_totals)))
+    if rules.surrender:
+        args.append("--surrender")
+    if not rules.hit_split_aces:
+        args.append("--no-hit-split-aces")
+    return " ".join(args)
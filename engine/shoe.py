@@ -0,0 +1,172 @@
+# engine/shoe.py
+"""The shoe: a multi-deck card source with a cut card and a running count."""
+import hashlib
+import random
+from functools import lru_cache
+from typing import NamedTuple
+
+from .cards import CARDS, NUM_DECKS, Hand
+from .counting import HI_LO, CountSystem
+
+PENETRATION = (1 / 2, 2 / 3)
+SEED_BITS = 64  # seeds are kept to this width, which the hand history stores
+
+
+def derive_seed(seed, *path: int) -> int:
+    """A child seed for stream ``path`` under ``seed``, stable across runs and platforms."""
+    text = ":".join(map(str, (seed, *path))).encode()
+    return int.from_bytes(hashlib.sha256(text).digest()[:8], "little")
+
+
+@lru_cache(maxsize=None)
+def _fresh_deck(num_decks: int) -> bytes:
+    """Every code ``num_decks`` times, in card order."""
+    return bytes(range(len(CARDS))) * num_decks
+
+
+class ShoeState(NamedTuple):
+    """Where a shoe is: which shuffle, and how many cards of it are dealt."""
+
+    shuffles: int
+    curr: int
+
+
+class Shoe:
+    """A shuffled multi-deck shoe that can be rewound to any point.
+
+    Shuffle ``k`` is a pure function of ``(seed, k)``: the deck is reset to
+    card order and Fisher-Yates shuffled in place with an RNG seeded from
+    ``derive_seed(seed, k)``, which also picks the cut. So ``state()`` at the
+    start of a round is a two-int checkpoint, and ``restore`` jumps straight
+    back to it without dealing the shoe's earlier rounds. A shoe without a
+    ``seed`` picks a random one and keeps it in ``seed``; any other int is
+    kept modulo ``2 ** SEED_BITS``, so a negative seed is a large positive one.
+
+    With ``batch`` > 0 the shuffles are generated ``batch`` at a time in one
+    vectorized NumPy call (``engine.batch.shuffled_codes``) instead; they
+    are just as reproducible but differ from the default mode's.
+
+    The running count (in ``system``) is updated as each card is exposed.
+    A shoe holds only its deck as bytes and a few ints: the card-order deck
+    is shared by every shoe of the same size and the RNG lives only for the
+    length of a shuffle.
+    """
+
+    __slots__ = (
+        "deck",
+        "_fresh",
+        "num_decks",
+        "cut_range",
+        "seed",
+        "batch",
+        "_block",
+        "shuffles",
+        "system",
+        "_weights",
+        "cut",
+        "curr",
+        "running_count",
+    )
+
+    def __init__(
+        self,
+        num_decks: int = NUM_DECKS,
+        seed: int | None = None,
+        system: CountSystem = HI_LO,
+        penetration: tuple[float, float] = PENETRATION,
+        batch: int = 0,
+    ):
+        self._fresh = _fresh_deck(num_decks)
+        self.deck = bytearray(self._fresh)
+        self.num_decks = num_decks
+        self.cut_range = (int(len(self.deck) * penetration[0]), int(len(self.deck) * penetration[1]))
+        self.seed = seed % (1 << SEED_BITS) if seed is not None else random.SystemRandom().getrandbits(63)
+        self.batch = batch
+        self._block = None  # (block number, shuffled codes, cuts) in batch mode
+        self.shuffles = 0
+        self.system = system
+        self._weights = system.code_weights
+        self.cut = self.curr = 0
+        self.running_count = system.initial_count(num_decks)
+
+    def __len__(self) -> int:
+        return len(self.deck)
+
+    @property
+    def needs_shuffle(self) -> bool:
+        return self.curr >= self.cut
+
+    @property
+    def decks_remaining(self) -> float:
+        return (len(self.deck) - self.curr) / 52
+
+    @property
+    def true_count(self) -> float:
+        left = len(self.deck) - self.curr
+        return self.running_count * 52 / left if left else 0.0
+
+    # ----- shuffling --------------------------------------------------------
+    def _deal_shuffle(self, k: int) -> None:
+        """Lay out shuffle ``k`` (1-based) and its cut."""
+        if self.batch:
+            self._batched_shuffle(k)
+            return
+        rng = random.Random(derive_seed(self.seed, k))
+        self.cut = rng.randrange(*self.cut_range)
+        deck, rand = self.deck, rng.random
+        deck[:] = self._fresh
+        for i in range(len(deck) - 1, 0, -1):
+            j = int(rand() * (i + 1))
+            deck[i], deck[j] = deck[j], deck[i]
+
+    def _batched_shuffle(self, k: int) -> None:
+        from .batch import shuffled_codes  # NumPy is only needed in batch mode
+
+        # shuffle numbers start at 1, so path (0, block) never collides with one
+        block, row = divmod(k - 1, self.batch)
+        if self._block is None or self._block[0] != block:
+            codes, cuts = shuffled_codes(self.batch, self.num_decks, derive_seed(self.seed, 0, block), self.cut_range)
+            self._block = (block, codes, cuts)
+        self.deck[:] = self._block[1][row].tobytes()
+        self.cut = int(self._block[2][row])
+
+    def shuffle(self) -> None:
+        """Start the next shuffle: a freshly shuffled, freshly cut shoe."""
+        self.shuffles += 1
+        self._deal_shuffle(self.shuffles)
+        self.curr = 0
+        self.running_count = self.system.initial_count(self.num_decks)
+
+    # ----- checkpoints ------------------------------------------------------
+    def state(self) -> ShoeState:
+        return ShoeState(self.shuffles, self.curr)
+
+    def restore(self, state: ShoeState) -> None:
+        """Jump to ``state``, re-laying out at most one shuffle.
+
+        Assumes every card before ``state.curr`` was exposed, as at the start
+        of a round, and recomputes the running count from them.
+        """
+        if state.shuffles != self.shuffles:
+            self.shuffles = state.shuffles
+            if state.shuffles:
+                self._deal_shuffle(state.shuffles)
+        self.curr = state.curr
+        weights = self._weights
+        self.running_count = self.system.initial_count(self.num_decks) + sum(
+            weights[code] for code in self.deck[: state.curr]
+        )
+
+    # ----- dealing ----------------------------------------------------------
+    def draw_card(self, target_hand: Hand, n: int = 1, exposed: bool = True) -> Hand:
+        """Deal ``n`` cards; face-down cards are counted later via ``expose``."""
+        for _ in range(n):
+            code = self.deck[self.curr]
+            target_hand.add(code)
+            self.curr += 1
+            if exposed:
+                self.running_count += self._weights[code]
+        return target_hand
+
+    def expose(self, code: int) -> None:
+        self.running_count += self._weights[code]
@@ -0,0 +1,319 @@
+# engine/simulate.py
+"""Headless Monte Carlo play: one seat against the dealer, no I/O.
+
+A strategy is any callable ``strategy(total, soft, pair, upcard, options)``
+returning one of ``options`` (the engine's ``hand_options`` names). ``pair``
+is the value of a splittable pair (0 otherwise) and ``upcard`` the dealer's
+upcard value with aces as 11. A strategy with a true ``uses_count``
+attribute is also passed ``true_count``, the floored true count of the cards
+seen so far. Strategies must be pure functions of their arguments: every
+distinct situation is decided once and then cached.
+"""
+import math
+import random
+from dataclasses import dataclass, field
+from itertools import accumulate
+
+from .arena import END, SURRENDERED, HandArena
+from .cards import RANK_VALUES, RANKS, Outcome
+from .counting import HI_LO, CountSystem
+from .rules import DEFAULT_RULES, Rules
+from .strategy import BasicStrategy
+
+
+# ---------------------------------------------------------------------------#
+#                                strategies                                  #
+# ---------------------------------------------------------------------------#
+def mimic_dealer(total, soft, pair, upcard, options) -> str:
+    return "hit" if total < 17 and "hit" in options else "stand"
+
+
+def never_bust(total, soft, pair, upcard, options) -> str:
+    if "double down" in options:
+        return "double down"
+    return "hit" if (total < 12 or (soft and total < 18)) and "hit" in options else "stand"
+
+
+# ---------------------------------------------------------------------------#
+#                                  results                                   #
+# ---------------------------------------------------------------------------#
+@dataclass
+class SimResult:
+    """Per-hand statistics in units of the initial bet.
+
+    ``outcomes`` tallies settled hands (split hands counted separately) by
+    ``Outcome``; ``counts`` maps the running count at the start of a round to
+    how many rounds started there, and ``true_counts`` maps the floored true
+    count at the start of a round to ``[rounds, net, sum_sq]``. Results merge
+    with ``+=``.
+    """
+
+    hands: int = 0
+    net: float = 0.0
+    sum_sq: float = 0.0
+    outcomes: list[int] = field(default_factory=lambda: [0] * len(Outcome))
+    counts: dict[int, int] = field(default_factory=dict)
+    true_counts: dict[int, list] = field(default_factory=dict)
+
+    def __iadd__(self, other: "SimResult") -> "SimResult":
+        self.hands += other.hands
+        self.net += other.net
+        self.sum_sq += other.sum_sq
+        self.outcomes = [a + b for a, b in zip(self.outcomes, other.outcomes)]
+        for rc, n in other.counts.items():
+            self.counts[rc] = self.counts.get(rc, 0) + n
+        for tc, row in other.true_counts.items():
+            mine = self.true_counts.setdefault(tc, [0, 0.0, 0.0])
+            for i in range(3):
+                mine[i] += row[i]
+        return self
+
+    @property
+    def ev(self) -> float:
+        return self.net / self.hands if self.hands else 0.0
+
+    @property
+    def variance(self) -> float:
+        if self.hands < 2:
+            return 0.0
+        return (self.sum_sq - self.net * self.net / self.hands) / (self.hands - 1)
+
+    @property
+    def stderr(self) -> float:
+        return math.sqrt(self.variance / self.hands) if self.hands else 0.0
+
+    def confidence_interval(self, z: float = 1.96) -> tuple[float, float]:
+        return self.ev - z * self.stderr, self.ev + z * self.stderr
+
+
+# ---------------------------------------------------------------------------#
+#                                 simulator                                  #
+# ---------------------------------------------------------------------------#
+def _decider(strategy, cache: dict):
+    uses_count = getattr(strategy, "uses_count", False)
+
+    def decide(total, soft, pair, upcard, can_split, can_double, can_surrender, true_count, can_hit=True):
+        key = (total, soft, pair, upcard, can_split, can_double, can_surrender, true_count, can_hit)
+        action = cache.get(key)
+        if action is None:
+            options = ["hit", "stand"] if can_hit else ["stand"]
+            if can_split:
+                options.append("split")
+            if can_double:
+                options.append("double down")
+            if can_surrender:
+                options.append("surrender")
+            if uses_count:
+                action = strategy(total, soft, pair, upcard, options, true_count=true_count)
+            else:
+                action = strategy(total, soft, pair, upcard, options)
+            cache[key] = action
+        return action
+
+    return decide
+
+
+def simulate(
+    rules: Rules | None = None,
+    strategy=None,
+    n_hands: int = 1_000_000,
+    seed=None,
+    system: CountSystem = HI_LO,
+) -> SimResult:
+    """Play ``n_hands`` rounds and return EV/variance per initial hand.
+
+    ``strategy`` defaults to basic strategy for ``rules``; ``system`` is the
+    count tracked for the count distributions and for count-aware strategies.
+
+    Mirrors ``Round``: the dealer peeks for blackjack, split hands never count
+    as blackjack and a two-card 21 stands. Everything ``rules`` varies (dealer
+    draws, doubling, split limits, surrender, payouts) is read from its
+    ``RuleConfig`` tables.
+    """
+    rules = rules if rules is not None else DEFAULT_RULES
+    strategy = strategy if strategy is not None else BasicStrategy(rules)
+    cache: dict = {}
+    decide = _decider(strategy, cache)
+    uses_count = getattr(strategy, "uses_count", False)
+    rng = random.Random(seed)
+    config = rules.config
+    bj_payout = float(config.payouts[Outcome.BLACKJACK])
+    surrender_loss = float(config.payouts[Outcome.SURRENDER])
+    dealer_hits, can_double = config.dealer_hits, config.can_double
+    max_splits, can_surrender = config.max_splits, rules.surrender
+    can_resplit, can_hit = config.can_resplit, config.can_hit
+    ACE = RANKS.index("A")
+    values = list(RANK_VALUES)
+    weights = system.rank_weights
+    initial = system.initial_count(rules.num_decks)
+    result = SimResult(n_hands)
+    tally, counts, by_tc = result.outcomes, result.counts, result.true_counts
+    PUSH, WIN, LOSE, BJ, BJ_PUSH, BUST, DEALER_BUST, DEALER_BJ, SURRENDER = range(len(Outcome))
+
+    # rank indices; a plain list indexes and shuffles faster than array("B") here
+    shoe = [r for r in range(len(RANKS)) for _ in range(4 * rules.num_decks)]
+    size = len(shoe)
+    cut_range = (int(size * rules.penetration[0]), int(size * rules.penetration[1]))
+    arena = HandArena.for_table(1, rules.max_hands, rules.num_decks)
+    hand, flags, nxt, bets, totals = arena.hand, arena.flags, arena.next, arena.bet, arena.total
+    curr = cut = 0
+    running = [0]
+    net = sum_sq = 0.0
+    tc = 0
+
+    for _ in range(n_hands):
+        if curr >= cut:
+            rng.shuffle(shoe)
+            cut = rng.randrange(*cut_range)
+            curr = 0
+            # running[i] is the running count once the first i cards are out
+            running = [*accumulate((weights[r] for r in shoe), initial=initial)]
+
+        rc = running[curr]
+        counts[rc] = counts.get(rc, 0) + 1
+        tc0 = rc * 52 // (size - curr)
+
+        d1, d2, p1, p2 = shoe[curr : curr + 4]
+        curr += 4
+        upcard, hole = values[d1], values[d2]
+        hidden = weights[d2]
+        dealer_bj = upcard + hole == 21
+        pv1, pv2 = values[p1], values[p2]
+
+        if pv1 + pv2 == 21:
+            if dealer_bj:
+                tally[BJ_PUSH] += 1
+                win = 0.0
+            else:
+                tally[BJ] += 1
+                win = bj_payout
+        elif dealer_bj:
+            tally[DEALER_BJ] += 1
+            win = -1.0
+        else:
+            # ----- player: one arena slot per hand, holding its second rank --
+            # every hand of a split tree starts with p1, so the slot's second
+            # card is all that differs between them
+            arena.reset()
+            slot = arena.add(p2, 1, 1)
+            while slot != END:
+                r2, split = hand[slot], flags[slot]
+                v1, v2 = pv1, values[r2]
+                total, soft = v1 + v2, (v1 == 11) + (v2 == 11)
+                if total > 21:
+                    total -= 10
+                    soft -= 1
+                aces = bool(split) and p1 == ACE
+                hits = can_hit[aces]
+                splits = p1 == r2 and arena.size <= max_splits and can_resplit[aces]
+                if total == 21 or not (hits or splits):
+                    totals[slot] = total
+                    slot = nxt[slot]
+                    continue
+                if uses_count:
+                    tc = (running[curr] - hidden) * 52 // (size - curr)
+                pair = v1 if p1 == r2 else 0
+                key = (
+                    total,
+                    soft > 0,
+                    pair,
+                    upcard,
+                    splits,
+                    hits and can_double[split][total],
+                    can_surrender and not split,
+                    tc,
+                    hits,
+                )
+                action = cache.get(key) or decide(*key)
+                if action == "split":
+                    n1, n2 = shoe[curr : curr + 2]
+                    curr += 2
+                    hand[slot] = n1
+                    arena.split(slot, n2)
+                    continue
+                if action == "surrender":
+                    flags[slot] |= SURRENDERED
+                    totals[slot] = total
+                    slot = nxt[slot]
+                    continue
+                if action == "double down":
+                    v = values[shoe[curr]]
+                    curr += 1
+                    total += v
+                    soft += v == 11
+                    while total > 21 and soft:
+                        total -= 10
+                        soft -= 1
+                    bets[slot] = 2
+                    totals[slot] = total
+                    slot = nxt[slot]
+                    continue
+                while action == "hit":
+                    v = values[shoe[curr]]
+                    curr += 1
+                    total += v
+                    soft += v == 11
+                    while total > 21 and soft:
+                        total -= 10
+                        soft -= 1
+                    if total >= 21:
+                        break
+                    if uses_count:
+                        tc = (running[curr] - hidden) * 52 // (size - curr)
+                    key = (total, soft > 0, 0, upcard, False, False, False, tc, True)
+                    action = cache.get(key) or decide(*key)
+                totals[slot] = total
+                slot = nxt[slot]
+            n = arena.size
+
+            # ----- dealer ---------------------------------------------------
+            if any(totals[i] <= 21 and not flags[i] & SURRENDERED for i in range(n)):
+                dealer = upcard + hole
+                dsoft = (upcard == 11) + (hole == 11)
+                if dealer > 21:
+                    dealer -= 10
+                    dsoft -= 1
+                while dealer_hits[dsoft > 0][dealer]:
+                    v = values[shoe[curr]]
+                    curr += 1
+                    dealer += v
+                    dsoft += v == 11
+                    while dealer > 21 and dsoft:
+                        dealer -= 10
+                        dsoft -= 1
+            else:
+                dealer = 0
+
+            # ----- settlement -----------------------------------------------
+            win = 0.0
+            for i in range(n):
+                total, bet = totals[i], bets[i]
+                if flags[i] & SURRENDERED:
+                    win += surrender_loss
+                    tally[SURRENDER] += 1
+                elif total > 21:
+                    win -= bet
+                    tally[BUST] += 1
+                elif dealer > 21:
+                    win += bet
+                    tally[DEALER_BUST] += 1
+                elif total > dealer:
+                    win += bet
+                    tally[WIN] += 1
+                elif total < dealer:
+                    win -= bet
+                    tally[LOSE] += 1
+                else:
+                    tally[PUSH] += 1
+
+        net += win
+        sum_sq += win * win
+        row = by_tc.get(tc0)
+        if row is None:
+            row = by_tc[tc0] = [0, 0.0, 0.0]
+        row[0] += 1
+        row[1] += win
+        row[2] += win * win
+
+    result.net, result.sum_sq = net, sum_sq
+    return result
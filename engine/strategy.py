@@ -0,0 +1,197 @@
+# engine/strategy.py
+"""Basic strategy as a precomputed lookup table.
+
+The table is a flat ``bytes`` of action codes indexed by
+``(kind * 22 + key) * 10 + upcard - 2``, where ``kind`` is hard, soft or
+pair, ``key`` is the hand total (or pair card value) and ``upcard`` the
+dealer's upcard value with aces as 11. Under surrender rules two more
+blocks follow (``SURRENDER_HARD`` and ``SURRENDER_PAIR``), holding 1 where
+giving up the two-card hand beats every other play. There is one table per
+``Rules.key``; each is generated offline from the exact EVs in
+``engine.exact``, stored in ``engine/data`` and only read the first time a
+recommendation is asked for. Only the default rules' table ships; generate
+others (a few minutes each) with e.g. ``python -m engine.strategy --h17
+--surrender``, which takes the options of ``add_rules_arguments``.
+"""
+import os
+
+from .cards import CODE_VALUES, Hand
+from .exact import DATA_DIR, UPCARDS, hand_evs, shoe_composition
+from .rules import DEFAULT_RULES, Rules, add_rules_arguments, hand_options, rules_arguments, rules_from_arguments
+
+HARD, SOFT, PAIR, SURRENDER_HARD, SURRENDER_PAIR = 0, 1, 2, 3, 4
+STAND, HIT, DOUBLE, SPLIT = 0, 1, 2, 3
+ACTIONS = ("stand", "hit", "double down", "split")  # DOUBLE falls back to a hit
+
+_tables: dict[str, bytes] = {}  # by Rules.key
+
+
+def _index(kind: int, key: int, upcard: int) -> int:
+    return (kind * 22 + key) * 10 + upcard - 2
+
+
+def _size(rules: Rules) -> int:
+    """Table bytes: hard, soft and pair blocks, plus two surrender blocks if offered."""
+    return (5 if rules.surrender else 3) * 22 * 10
+
+
+# ---------------------------------------------------------------------------#
+#                             offline generation                             #
+# ---------------------------------------------------------------------------#
+def _best(evs: dict[str, float]) -> int:
+    return ACTIONS.index(max(evs, key=evs.get))
+
+
+def _averaged(combos, upcard, comp, rules) -> dict[str, float]:
+    """Probability-weighted EVs over the two-card hands that make one total."""
+    acc: dict[str, float] = {}
+    weight = 0
+    for a, b in combos:
+        w = comp[a - 2] * (comp[b - 2] - (a == b))
+        if not w:
+            continue
+        evs = hand_evs(a, b, upcard, comp, rules)
+        evs.pop("split", None)
+        for action, ev in evs.items():
+            acc[action] = acc.get(action, 0.0) + w * ev
+        weight += w
+    return {action: ev / weight for action, ev in acc.items()}
+
+
+def _surrenders(evs: dict[str, float]) -> int:
+    return max(evs, key=evs.get) == "surrender"
+
+
+def build_table(rules: Rules = DEFAULT_RULES) -> bytes:
+    comp = shoe_composition(rules.num_decks)
+    table = bytearray(_size(rules))
+    pairs_by_total: dict[tuple[int, bool], list[tuple[int, int]]] = {}
+    for a in range(2, 12):
+        for b in range(a, 12):
+            total = a + b if a + b <= 21 else a + b - 10
+            pairs_by_total.setdefault((total, 11 in (a, b)), []).append((a, b))
+
+    for up in UPCARDS:
+        for total in range(4, 22):
+            combos = [c for c in pairs_by_total.get((total, False), []) if c[0] != c[1]]
+            if total >= 21:
+                table[_index(HARD, total, up)] = STAND
+                continue
+            combos = combos or pairs_by_total[(total, False)]
+            evs = _averaged(combos, up, comp, rules)
+            if rules.surrender:
+                table[_index(SURRENDER_HARD, total, up)] = _surrenders(evs)
+                del evs["surrender"]
+            table[_index(HARD, total, up)] = _best(evs)
+        for total in range(12, 22):
+            if total == 21:
+                table[_index(SOFT, total, up)] = STAND
+                continue
+            combos = pairs_by_total[(total, True)]
+            evs = _averaged(combos, up, comp, rules)
+            evs.pop("surrender", None)
+            table[_index(SOFT, total, up)] = _best(evs)
+        for value in range(2, 12):
+            evs = hand_evs(value, value, up, comp, rules)
+            if rules.surrender:
+                table[_index(SURRENDER_PAIR, value, up)] = _surrenders(evs)
+                del evs["surrender"]
+            table[_index(PAIR, value, up)] = _best(evs)
+    return bytes(table)
+
+
+def _path(rules: Rules) -> str:
+    return os.path.join(DATA_DIR, f"strategy_{rules.key}.bin")
+
+
+def save_table(rules: Rules = DEFAULT_RULES) -> str:
+    table = build_table(rules)
+    os.makedirs(DATA_DIR, exist_ok=True)
+    with open(_path(rules), "wb") as f:
+        f.write(table)
+    return _path(rules)
+
+
+def load_table(rules: Rules = DEFAULT_RULES) -> bytes:
+    """The table for ``rules``, read once and then kept on ``rules.config``.
+
+    Tables are never built here, since that takes minutes: a missing one
+    raises ``FileNotFoundError`` naming the command that generates it.
+    """
+    table = _tables.get(rules.key)
+    if table is None:
+        try:
+            with open(_path(rules), "rb") as f:
+                table = _tables[rules.key] = f.read()
+        except FileNotFoundError:
+            command = f"python -m engine.strategy {rules_arguments(rules)}".rstrip()
+            raise FileNotFoundError(f"no basic-strategy table for rules {rules.key}; generate it with `{command}`") from None
+        if len(table) != _size(rules):
+            del _tables[rules.key]
+            raise ValueError(f"{_path(rules)} is not a basic-strategy table for rules {rules.key} (regenerate it)")
+    rules.config.strategy = table
+    return table
+
+
+# ---------------------------------------------------------------------------#
+#                                   advice                                   #
+# ---------------------------------------------------------------------------#
+def lookup(total: int, soft: bool, pair: int, upcard: int, rules: Rules = DEFAULT_RULES) -> int:
+    table = rules.config.strategy or load_table(rules)
+    if pair:
+        return table[_index(PAIR, pair, upcard)]
+    return table[_index(SOFT if soft else HARD, total, upcard)]
+
+
+def _play(total: int, soft: bool, pair: int, upcard: int, options, rules: Rules) -> str:
+    """The table's action for a hand, restricted to ``options``."""
+    if "split" not in options:
+        pair = 0
+    if "surrender" in options:
+        if not rules.surrender:
+            raise ValueError(f"surrender offered, but rules {rules.key} have no surrender table")
+        table = rules.config.strategy or load_table(rules)
+        if table[_index(SURRENDER_PAIR, pair, upcard) if pair else _index(SURRENDER_HARD, total, upcard)]:
+            return "surrender"
+    action = lookup(total, soft, pair, upcard, rules)
+    if action == DOUBLE and "double down" not in options:
+        action = HIT
+    if action == HIT and "hit" not in options:  # split aces that only re-split or stand
+        action = STAND
+    return ACTIONS[action]
+
+
+class BasicStrategy:
+    """``simulate`` strategy: the table for ``rules``, restricted to ``options``.
+
+    Instances pickle, so they can be handed to ``simulate_parallel``.
+    """
+
+    def __init__(self, rules: Rules = DEFAULT_RULES):
+        self.rules = rules
+
+    def __call__(self, total, soft, pair, upcard, options) -> str:
+        return _play(total, soft, pair, upcard, options, self.rules)
+
+
+basic_strategy = BasicStrategy()
+
+
+def recommend(hand: Hand, dealer_upcard: int, rules: Rules = DEFAULT_RULES, options=None) -> str:
+    """Basic-strategy action for ``hand`` against the dealer's upcard (a card code).
+
+    ``options`` are the hand's legal actions (``Round.options()``); by default
+    those of an unsplit hand under ``rules``.
+    """
+    if options is None:
+        options = hand_options(hand, rules)
+    pair = CODE_VALUES[hand[0]] if "split" in options else 0
+    return _play(hand.total, hand.soft > 0, pair, CODE_VALUES[dealer_upcard], options, rules)
+
+
+if __name__ == "__main__":
+    import argparse  # only the generator needs it
+
+    parser = argparse.ArgumentParser(description="Generate the basic-strategy table for a rule set.")
+    add_rules_arguments(parser)
+    print(save_table(rules_from_arguments(parser.parse_args())))
@@ -0,0 +1,437 @@
+# engine/table.py
+"""Table (players, chips, bets) and Round (one deal through settlement)."""
+from array import array
+from time import perf_counter_ns
+
+from .arena import (
+    BLACKJACK_HAND,
+    BUST,
+    DOUBLE_DOWN,
+    DOUBLED,
+    END,
+    SPLIT,
+    SPLIT_HAND,
+    STAND,
+    SURRENDER,
+    SURRENDERED,
+    HandArena,
+)
+from .cards import ACE_CODES, Hand, Outcome, compare_hand
+from .rules import DEFAULT_RULES, Rules, hand_options
+from .shoe import Shoe
+
+MIN_BET, REBUY_AMOUNT, STARTING_CHIPS = 5, 100, 100
+CENTS = 100  # chips are kept in hundredths, so 3:2, 6:5 and half-bet payouts stay exact
+# option names (as in ``Round.options``) -> Round methods, for ``Round.act``
+_METHODS = {"hit": "hit", "stand": "stand", "split": "split", "double down": "double_down", "surrender": "surrender"}
+
+
+class ChipStacks:
+    """Every player's chips as whole cents in one ``array("q")``.
+
+    Indexing reads and writes chips, like the list it replaces
+    (``chips[0] += 15``; whole amounts read back as ints); settlement adds
+    to ``cents`` directly.
+    """
+
+    __slots__ = ("cents",)
+
+    def __init__(self, amounts):
+        self.cents = array("q", (round(a * CENTS) for a in amounts))
+
+    def __getitem__(self, i: int):
+        c = self.cents[i]
+        return c // CENTS if c % CENTS == 0 else c / CENTS
+
+    def __setitem__(self, i: int, amount) -> None:
+        self.cents[i] = round(amount * CENTS)
+
+    def __len__(self) -> int:
+        return len(self.cents)
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self.cents)))
+
+    def __eq__(self, other) -> bool:
+        return list(self) == list(other)
+
+    def __repr__(self) -> str:
+        return f"ChipStacks({list(self)})"
+
+
+class Table:
+    """Seats, chip stacks and standing bets for a run of rounds on one shoe.
+
+    Everything a table holds is fixed-size once it is built: bets and chips
+    are integer arrays, hands are slots of a preallocated ``HandArena``.
+    """
+
+    __slots__ = (
+        "num_players",
+        "history",
+        "metrics",
+        "watchers",
+        "rules",
+        "shoe",
+        "min_bet",
+        "rebuy_amount",
+        "chips",
+        "bets",
+        "arena",
+    )
+
+    def __init__(
+        self,
+        num_players: int = 2,
+        shoe: Shoe | None = None,
+        min_bet: int = MIN_BET,
+        rebuy_amount: int = REBUY_AMOUNT,
+        starting_chips: int = STARTING_CHIPS,
+        rules: Rules = DEFAULT_RULES,
+        history=None,
+        metrics=None,
+    ):
+        self.num_players = num_players
+        self.history = history  # e.g. a HistoryWriter; records every finished round
+        self.metrics = metrics  # a Metrics; its sampled rounds are InstrumentedRounds
+        self.rules = rules
+        self.shoe = shoe if shoe is not None else Shoe(rules.num_decks, penetration=rules.penetration)
+        self.min_bet = min_bet
+        self.rebuy_amount = rebuy_amount
+        self.chips = ChipStacks([starting_chips] * num_players)
+        self.bets = array("q", [min_bet]) * num_players
+        self.arena = HandArena.for_table(num_players, rules.max_hands, rules.num_decks)
+        self.watchers = []
+
+    def watch(self, watcher):
+        """Subscribe ``watcher(event, rnd, slot)`` to every round's changes:
+
+        - "dealt": the hands are out (``slot`` is ``END``);
+        - "card": a card went to hand ``slot`` (``END`` for the dealer);
+        - "status": hand ``slot`` got a new ``arena.status``;
+        - "turn": hand ``slot`` is to act (``END`` when none is), with
+          ``rnd.options()`` already updated;
+        - "settled": every hand has an outcome.
+
+        Returns ``watcher``, so it works as a decorator.
+        """
+        self.watchers.append(watcher)
+        return watcher
+
+    def unwatch(self, watcher) -> None:
+        self.watchers.remove(watcher)
+
+    def place_bet(self, player: int, amount: int) -> int:
+        """Set player's (1-based) bet, falling back to the minimum if it's out of range."""
+        if amount > self.chips[player - 1] or amount < self.min_bet:
+            amount = self.min_bet
+        self.bets[player - 1] = amount
+        return amount
+
+    def rebuy(self) -> list[int]:
+        """Top up every player below the minimum bet; returns who rebought."""
+        rebought = []
+        for p in range(self.num_players):
+            if self.chips[p] < self.min_bet:
+                self.chips[p] += self.rebuy_amount
+                rebought.append(p + 1)
+        return rebought
+
+    def new_round(self) -> "Round":
+        if self.metrics is not None and self.metrics.sampled():
+            return InstrumentedRound(self)
+        return Round(self)
+
+
+class Round:
+    """One deal, from the table's bets through settlement.
+
+    The dealer's hand is ``dealer``. Player hands are slots of the table's
+    ``HandArena`` (``arena``): one per seat in seat order, then one per split,
+    each with its own bet. The table reuses the arena for its next round, so
+    read a round's hands before dealing another.
+
+    ``slot`` is the hand being played (``END`` once all are done) and ``turn``
+    its 1-based place in play order. Derived state (the current hand's legal
+    actions, statuses, totals) is updated as cards and actions happen, never
+    recomputed on read, and every change is reported to ``table.watchers``.
+    """
+
+    __slots__ = (
+        "table",
+        "rules",
+        "config",
+        "rebought",
+        "shuffled",
+        "checkpoint",
+        "hand_counts",
+        "outcomes",
+        "dealer",
+        "arena",
+        "dealer_blackjack",
+        "turn",
+        "slot",
+        "legal",
+        "watchers",
+    )
+
+    def __init__(self, table: Table):
+        self.table = table
+        self.rules = table.rules
+        self.config = table.rules.config
+        self.watchers = table.watchers
+        shoe = table.shoe
+
+        self.rebought = table.rebuy()
+        self.shuffled = shoe.needs_shuffle
+        if self.shuffled:
+            shoe.shuffle()
+        self.checkpoint = shoe.state()  # Shoe.restore(checkpoint) re-deals this round
+        for p in range(1, table.num_players + 1):
+            table.place_bet(p, table.bets[p - 1])
+
+        n = table.num_players
+        self.hand_counts = [1] * n  # hands each player holds, for the split limit
+        self.outcomes: list[Outcome] = []
+        self.dealer = shoe.draw_card(shoe.draw_card(Hand()), exposed=False)  # upcard, hole card
+        arena = self.arena = table.arena
+        arena.reset()
+        for p in range(1, n + 1):
+            arena.add(shoe.draw_card(Hand(), 2), p, table.bets[p - 1])
+
+        self.dealer_blackjack = self.dealer.total == 21
+        self.turn = 1
+        self.slot = arena.head
+        self.legal: list[str] = []
+        if self.watchers:
+            self._emit("dealt", END)
+        if self.dealer_blackjack:
+            self.slot, self.turn = END, n + 1
+            if self.watchers:
+                self._emit("turn", END)
+        else:
+            self._skip_finished()
+
+    # ----- turn bookkeeping -------------------------------------------------
+    def _emit(self, event: str, slot: int) -> None:
+        for watcher in self.watchers:
+            watcher(event, self, slot)
+
+    @property
+    def active(self) -> bool:
+        return self.slot != END
+
+    @property
+    def current(self) -> Hand:
+        return self.arena.hand[self.slot]
+
+    def _split_aces(self, slot: int) -> bool:
+        return bool(self.arena.flags[slot] & SPLIT) and self.arena.hand[slot][0] in ACE_CODES
+
+    def _can_split(self, slot: int, aces: bool) -> bool:
+        arena = self.arena
+        return self.hand_counts[arena.player[slot] - 1] <= self.config.max_splits and self.config.can_resplit[aces]
+
+    def _finished(self, slot: int) -> bool:
+        """Two-card 21s stand; so do split aces that may neither be hit nor re-split."""
+        hand = self.arena.hand[slot]
+        if len(hand) != 2:
+            return False
+        if hand.total == 21:
+            return True
+        aces = self._split_aces(slot)
+        return not self.config.can_hit[aces] and not (hand.is_pair and self._can_split(slot, aces))
+
+    def _skip_finished(self) -> None:
+        """Move past hands with nothing to decide, then refresh ``legal``."""
+        arena = self.arena
+        while self.active and self._finished(self.slot):
+            if arena.hand[self.slot].total == 21 and not arena.flags[self.slot] & SPLIT:
+                arena.status[self.slot] = BLACKJACK_HAND
+                if self.watchers:
+                    self._emit("status", self.slot)
+            self.slot = arena.next[self.slot]
+            self.turn += 1
+        self._refresh()
+
+    def _refresh(self) -> None:
+        """Recompute the current hand's legal actions after it changed."""
+        s, arena = self.slot, self.arena
+        if s == END:
+            self.legal = []
+        else:
+            config, hand = self.config, arena.hand[s]
+            split = arena.flags[s] & SPLIT
+            aces = bool(split) and hand[0] in ACE_CODES
+            can_split = self.hand_counts[arena.player[s] - 1] <= config.max_splits and config.can_resplit[aces]
+            self.legal = hand_options(hand, self.rules, bool(split), can_split, config.can_hit[aces])
+        if self.watchers:
+            self._emit("turn", s)
+
+    def _next(self, status: int) -> None:
+        self.arena.status[self.slot] = status
+        if self.watchers:
+            self._emit("status", self.slot)
+        self.slot = self.arena.next[self.slot]
+        self.turn += 1
+        self._skip_finished()
+
+    def _draw(self, slot: int) -> None:
+        self.table.shoe.draw_card(self.arena.hand[slot])
+        if self.watchers:
+            self._emit("card", slot)
+
+    def options(self) -> list[str]:
+        """The current hand's legal actions (kept up to date; don't mutate)."""
+        return self.legal
+
+    # ----- player actions ---------------------------------------------------
+    def act(self, action: str):
+        """Play ``action`` by its option name, e.g. "double down"."""
+        method = _METHODS.get(action)
+        if method is None:
+            raise ValueError(f"{action!r} is not an action")
+        return getattr(self, method)()
+
+    def hit(self) -> bool:
+        """Draw to the current hand; returns True if it busted."""
+        self._draw(self.slot)
+        if self.current.total > 21:
+            self._next(BUST)
+            return True
+        self._refresh()
+        return False
+
+    def stand(self) -> None:
+        self._next(STAND)
+
+    def split(self) -> None:
+        """Split the current pair into two hands, each drawing a second card."""
+        s, arena = self.slot, self.arena
+        new = arena.split(s, arena.hand[s].split())
+        self.hand_counts[arena.player[s] - 1] += 1
+        arena.status[s] = arena.status[new] = SPLIT_HAND
+        if self.watchers:
+            self._emit("status", s)
+            self._emit("status", new)
+        self._draw(s)
+        self._draw(new)
+        self._skip_finished()
+
+    def double_down(self) -> None:
+        s = self.slot
+        self.arena.flags[s] |= DOUBLED
+        self.arena.bet[s] *= 2
+        self._draw(s)
+        self._next(DOUBLE_DOWN)
+
+    def surrender(self) -> None:
+        """Give up the hand for half the bet (late surrender: the dealer has peeked)."""
+        self.arena.flags[self.slot] |= SURRENDERED
+        self._next(SURRENDER)
+
+    # ----- dealer & settlement ----------------------------------------------
+    def play_dealer(self) -> Hand:
+        dealer = self.dealer
+        self.table.shoe.expose(dealer[1])
+        hits = self.config.dealer_hits
+        while hits[dealer.soft > 0][dealer.total]:
+            self.table.shoe.draw_card(dealer)
+            if self.watchers:
+                self._emit("card", END)
+        return dealer
+
+    def finish(self) -> list[Outcome]:
+        """Reveal the hole card, play out the dealer and settle every hand;
+        returns the outcomes in play order (also in ``arena.outcome``)."""
+        dealer = self.play_dealer()
+        cents, payouts, arena = self.table.chips.cents, self.config.payout_cents, self.arena
+        self.outcomes = []
+        for s in arena.order():
+            hand, flags = arena.hand[s], arena.flags[s]
+            if flags & SURRENDERED:
+                outcome = Outcome.SURRENDER
+            else:
+                outcome = compare_hand(hand, dealer, flags & SPLIT)
+            arena.total[s] = hand.total
+            arena.outcome[s] = outcome
+            cents[arena.player[s] - 1] += arena.bet[s] * payouts[outcome]
+            self.outcomes.append(outcome)
+        if self.table.history is not None:
+            self.table.history.record(self)
+        if self.watchers:
+            self._emit("settled", END)
+        return self.outcomes
+
+    def net(self, slot: int) -> float:
+        """Chips won or lost by the settled hand in ``slot``."""
+        return self.arena.bet[slot] * self.config.payouts[self.arena.outcome[slot]]
+
+
+class InstrumentedRound(Round):
+    """A ``Round`` that reports to ``table.metrics``: time per phase
+    ("shuffle", "deal", "decision", "dealer", "settle"), a counter per action
+    and outcome, cards dealt, and every event to the hooks."""
+
+    __slots__ = ("metrics", "_first_card", "_dealer_ns")
+
+    def __init__(self, table: Table):
+        m, shoe = table.metrics, table.shoe
+        shuffled = shoe.needs_shuffle
+        if shuffled:
+            start = perf_counter_ns()
+            shoe.shuffle()
+            m.add_time("shuffle", perf_counter_ns() - start)
+            m.count("shuffles")
+        start = perf_counter_ns()
+        super().__init__(table)
+        m.add_time("deal", perf_counter_ns() - start)
+        self.shuffled = shuffled
+        self.metrics = m
+        self._first_card = self.checkpoint.curr
+        m.count("hands", table.num_players)
+        m.emit("dealt", self)
+
+    def _act(self, action: str, *args):
+        m = self.metrics
+        start = perf_counter_ns()
+        result = getattr(super(), action)(*args)
+        m.add_time("decision", perf_counter_ns() - start)
+        m.count(action)
+        m.emit(action, self)
+        return result
+
+    def hit(self) -> bool:
+        return self._act("hit")
+
+    def stand(self) -> None:
+        self._act("stand")
+
+    def split(self) -> None:
+        self._act("split")
+        self.metrics.count("hands")
+
+    def double_down(self) -> None:
+        self._act("double_down")
+
+    def surrender(self) -> None:
+        self._act("surrender")
+
+    def play_dealer(self) -> Hand:
+        start = perf_counter_ns()
+        dealer = super().play_dealer()
+        self._dealer_ns = perf_counter_ns() - start
+        self.metrics.add_time("dealer", self._dealer_ns)
+        return dealer
+
+    def finish(self) -> list[Outcome]:
+        m = self.metrics
+        self._dealer_ns = 0
+        start = perf_counter_ns()
+        outcomes = super().finish()
+        m.add_time("settle", perf_counter_ns() - start - self._dealer_ns)
+        for outcome in outcomes:
+            m.count(f"outcome_{outcome.name.lower()}")
+        m.count("cards", self.table.shoe.curr - self._first_card)
+        m.emit("settled", self)
+        return outcomes
@@ -0,0 +1,421 @@
+# tableserver.py
+"""An asyncio server hosting many independent blackjack tables.
+
+    python3 tableserver.py --port 7000          # or --unix /tmp/blackjack.sock
+    python3 blackjack.py --connect 127.0.0.1:7000
+
+The rule options (``--decks``, ``--h17``, ``--no-das``, ...) are those of
+``engine.rules.add_rules_arguments``, as for the table generators.
+
+Every table is its own ``engine.Table`` (shoe, count, chips, round), held in
+one ``TableSession``; nothing is shared between tables, so one process can
+host thousands of them. A table's state is slotted objects over bytes and
+integer arrays: a 2-player table with a round in progress takes about
+3.0 kB (2.6 kB with one player, 4.7 kB with seven; see ``table_bytes``), and
+``TABLE_BYTES`` is the budget the tests and ``bench.py`` hold it to. Clients
+speak a compact binary protocol over TCP or a Unix socket, and one connection
+may drive any number of tables.
+
+Protocol. Every frame is ``FRAME`` (payload length, message type, table id)
+followed by the payload; all integers are little-endian. Requests:
+
+    OPEN   <BQ  players, seed (0 = random); the table id is ignored
+    BET    <BI  player (1-based), amount
+    DEAL        deal a round with the current bets
+    ACT    <B   index into ACTIONS; must be one of the current options
+    STATE       just report
+    CLOSE       drop the table
+
+Each request is answered by one reply frame for the same table: ``STATE``
+(see ``encode_state``), ``CLOSED``, or ``ERROR`` with a UTF-8 message; an
+error, even an internal one, leaves the connection and its tables open.
+"""
+import argparse
+import asyncio
+import gc
+import socket
+import struct
+import traceback
+import tracemalloc
+
+from engine import DEFAULT_RULES, MIN_BET, REBUY_AMOUNT, HandArena, Hand, Outcome, Rules, Shoe, Table
+from engine.arena import END, NO_OUTCOME
+from engine.rules import add_rules_arguments, rules_from_arguments
+
+FRAME = struct.Struct("<HBI")  # payload length, message type, table id
+OPEN, BET, DEAL, ACT, STATE, CLOSE = range(1, 7)
+R_STATE, R_CLOSED, R_ERROR = 0x80, 0x81, 0x82
+ACTIONS = ("hit", "stand", "split", "double down", "surrender")
+MAX_PLAYERS = 7
+TABLE_BYTES = 3_200  # memory budget for a hosted 2-player table mid-round
+HIDDEN = 0xFF  # the dealer's hole card while hands are still to play
+NONE = 0xFF  # no current hand
+
+# state payload: table id, playing, players, current hand's place in play
+# order, options bitmask, shuffled, rebought bitmask, running count, cards left
+STATE_HEAD = struct.Struct("<IBBBBBBhH")
+HAND_HEAD = struct.Struct("<BBBBIB")  # player, flags, status, outcome, bet, cards
+
+
+class ProtocolError(Exception):
+    """A request the server refuses; the message goes back as ``ERROR``."""
+
+
+# ---------------------------------------------------------------------------#
+#                                  server                                    #
+# ---------------------------------------------------------------------------#
+class TableSession:
+    """One hosted table and its round in progress."""
+
+    __slots__ = ("id", "table", "rnd")
+
+    def __init__(self, table_id: int, players: int, rules: Rules, seed: int | None):
+        self.id = table_id
+        shoe = Shoe(rules.num_decks, seed=seed, penetration=rules.penetration)
+        self.table = Table(players, shoe=shoe, rules=rules)
+        self.rnd = None
+
+    def bet(self, player: int, amount: int) -> None:
+        if self.rnd is not None and self.rnd.active:
+            raise ProtocolError("bets are locked while a round is playing")
+        if not 1 <= player <= self.table.num_players:
+            raise ProtocolError(f"no player {player}")
+        self.table.place_bet(player, amount)
+
+    def deal(self) -> None:
+        if self.rnd is not None and self.rnd.active:
+            raise ProtocolError("a round is already playing")
+        self.rnd = self.table.new_round()
+        if not self.rnd.active:
+            self.rnd.finish()
+
+    def act(self, action: int) -> None:
+        rnd = self.rnd
+        if rnd is None or not rnd.active:
+            raise ProtocolError("no hand to play")
+        if action >= len(ACTIONS) or ACTIONS[action] not in rnd.options():
+            raise ProtocolError(f"action {action} is not allowed now")
+        rnd.act(ACTIONS[action])
+        if not rnd.active:
+            rnd.finish()
+
+
+def table_bytes(n: int = 2_000, players: int = 2, rules: Rules = DEFAULT_RULES) -> float:
+    """Traced memory per hosted table, each with a round in progress,
+    averaged over ``n`` seeded tables (deterministic for a given ``n``)."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        sessions = []
+        for i in range(n):
+            session = TableSession(i, players, rules, i + 1)
+            session.deal()
+            sessions.append(session)
+        gc.collect()
+        return tracemalloc.get_traced_memory()[0] / n
+    finally:
+        tracemalloc.stop()
+
+
+def encode_state(session: TableSession) -> bytes:
+    """A table as the ``STATE`` payload: ``STATE_HEAD``, then chips
+    (``d`` each) and bets (``I`` each) per player, the dealer's cards
+    (count byte, then codes, ``HIDDEN`` for the hole card while playing) and
+    the hands in play order (count byte, then ``HAND_HEAD`` and codes each)."""
+    table, rnd = session.table, session.rnd
+    shoe, n = table.shoe, table.num_players
+    playing = rnd is not None and rnd.active
+    opts = 0
+    if playing:
+        for name in rnd.options():
+            opts |= 1 << ACTIONS.index(name)
+    rebought = 0
+    for p in rnd.rebought if rnd is not None else ():
+        rebought |= 1 << (p - 1)
+    out = bytearray(
+        STATE_HEAD.pack(
+            session.id,
+            playing,
+            n,
+            rnd.turn - 1 if playing else NONE,
+            opts,
+            rnd is not None and rnd.shuffled,
+            rebought,
+            shoe.running_count,
+            len(shoe) - shoe.curr,
+        )
+    )
+    out += struct.pack(f"<{n}d{n}I", *table.chips, *table.bets)
+    if rnd is None:
+        out += b"\0\0"
+        return bytes(out)
+    dealer = bytes(rnd.dealer.cards)
+    if playing:
+        dealer = dealer[:1] + bytes([HIDDEN])
+    out.append(len(dealer))
+    out += dealer
+    arena = rnd.arena
+    order = arena.order()
+    out.append(len(order))
+    for s in order:
+        cards = arena.hand[s].cards
+        out += HAND_HEAD.pack(
+            arena.player[s],
+            arena.flags[s],
+            arena.status[s],
+            NO_OUTCOME if playing else arena.outcome[s],
+            arena.bet[s],
+            len(cards),
+        )
+        out += cards
+    return bytes(out)
+
+
+class TableServer:
+    """Sessions by table id, and the request dispatch for every connection."""
+
+    def __init__(self, rules: Rules = DEFAULT_RULES, max_tables: int = 100_000):
+        self.rules = rules
+        self.max_tables = max_tables
+        self.sessions: dict[int, TableSession] = {}
+        self.next_id = 1
+
+    def handle(self, kind: int, table_id: int, payload: bytes) -> tuple[int, int, bytes]:
+        """One request to one reply, as (type, table id, payload)."""
+        try:
+            if kind == OPEN:
+                players, seed = struct.unpack("<BQ", payload)
+                if not 1 <= players <= MAX_PLAYERS:
+                    raise ProtocolError(f"players must be 1-{MAX_PLAYERS}")
+                if len(self.sessions) >= self.max_tables:
+                    raise ProtocolError("server is full")
+                table_id, self.next_id = self.next_id, self.next_id + 1
+                session = self.sessions[table_id] = TableSession(table_id, players, self.rules, seed or None)
+                return R_STATE, table_id, encode_state(session)
+            session = self.sessions.get(table_id)
+            if session is None:
+                raise ProtocolError(f"no table {table_id}")
+            if kind == BET:
+                session.bet(*struct.unpack("<BI", payload))
+            elif kind == DEAL:
+                session.deal()
+            elif kind == ACT:
+                session.act(*struct.unpack("<B", payload))
+            elif kind == CLOSE:
+                del self.sessions[table_id]
+                return R_CLOSED, table_id, b""
+            elif kind != STATE:
+                raise ProtocolError(f"unknown message type {kind}")
+            return R_STATE, table_id, encode_state(session)
+        except (ProtocolError, struct.error) as e:
+            return R_ERROR, table_id, str(e).encode()
+        except Exception as e:  # a bug in one request must not drop the connection's other tables
+            traceback.print_exc()
+            return R_ERROR, table_id, f"internal error: {e!r}".encode()
+
+    async def serve_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                size, kind, table_id = FRAME.unpack(await reader.readexactly(FRAME.size))
+                payload = await reader.readexactly(size) if size else b""
+                reply, table_id, body = self.handle(kind, table_id, payload)
+                writer.write(FRAME.pack(len(body), reply, table_id) + body)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(server: TableServer, host: str = "127.0.0.1", port: int = 0, unix: str | None = None):
+    """Start listening; returns the ``asyncio.Server``."""
+    if unix:
+        return await asyncio.start_unix_server(server.serve_client, unix)
+    return await asyncio.start_server(server.serve_client, host, port)
+
+
+# ---------------------------------------------------------------------------#
+#                                thin client                                 #
+# ---------------------------------------------------------------------------#
+class RemoteShoe:
+    """The count of a remote table's shoe, as last reported."""
+
+    def __init__(self):
+        self.running_count = 0
+        self.cards_left = 1
+
+    @property
+    def true_count(self) -> float:
+        return self.running_count * 52 / self.cards_left if self.cards_left else 0.0
+
+
+class RemoteTable:
+    """A blocking client for one hosted table, shaped like ``engine.Table``
+    so a front-end can draw it unchanged: ``new_round()`` deals and returns
+    a ``RemoteRound`` whose actions are sent to the server."""
+
+    def __init__(self, address: str, num_players: int = 1, seed: int = 0):
+        if "/" in address:
+            self.sock = socket.socket(socket.AF_UNIX)
+            self.sock.connect(address)
+        else:
+            host, port = address.rsplit(":", 1)
+            self.sock = socket.create_connection((host, int(port)))
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.file = self.sock.makefile("rb")
+        self.id = 0
+        self.num_players = num_players
+        self.rebuy_amount = REBUY_AMOUNT
+        self.min_bet = MIN_BET
+        self.shoe = RemoteShoe()
+        self.chips: list[float] = []
+        self.bets: list[int] = []
+        self.rnd = RemoteRound(self)
+        self.watchers = []
+        self.request(OPEN, struct.pack("<BQ", num_players, seed))
+
+    def request(self, kind: int, payload: bytes = b"") -> None:
+        self.sock.sendall(FRAME.pack(len(payload), kind, self.id) + payload)
+        size, reply, self.id = FRAME.unpack(self.file.read(FRAME.size))
+        body = self.file.read(size)
+        if reply == R_ERROR:
+            raise ProtocolError(body.decode())
+        if reply == R_STATE:
+            self._decode(body)
+
+    def _decode(self, body: bytes) -> None:
+        head = STATE_HEAD.unpack_from(body)
+        _, playing, n, current, opts, shuffled, rebought, running, left = head
+        pos = STATE_HEAD.size
+        values = struct.unpack_from(f"<{n}d{n}I", body, pos)
+        pos += n * 12
+        self.chips, self.bets = list(values[:n]), list(values[n:])
+        self.shoe.running_count, self.shoe.cards_left = running, left
+
+        rnd = self.rnd
+        ncards = body[pos]
+        cards = body[pos + 1 : pos + 1 + ncards]
+        pos += 1 + ncards
+        rnd.dealer = Hand(c for c in cards if c != HIDDEN)
+        if HIDDEN in cards:
+            rnd.dealer.cards.append(HIDDEN)  # drawn face down, never scored
+        nhands = body[pos]
+        pos += 1
+        arena = rnd.arena = HandArena(max(nhands, 1))
+        outcomes = []
+        for _ in range(nhands):
+            player, flags, status, outcome, bet, ncards = HAND_HEAD.unpack_from(body, pos)
+            pos += HAND_HEAD.size
+            s = arena.add(Hand(body[pos : pos + ncards]), player, bet)
+            pos += ncards
+            arena.flags[s], arena.status[s], arena.outcome[s] = flags, status, outcome
+            if outcome != NO_OUTCOME:
+                outcomes.append(Outcome(outcome))
+        rnd.outcomes = outcomes
+        rnd.slot = current if playing else END
+        rnd.opts = [name for i, name in enumerate(ACTIONS) if opts >> i & 1]
+        rnd.shuffled = bool(shuffled)
+        rnd.rebought = [p + 1 for p in range(n) if rebought >> p & 1]
+        for watcher in self.watchers:
+            watcher("state", rnd, rnd.slot)
+
+    def watch(self, watcher):
+        """Like ``Table.watch``, but each reply is one "state" event: the
+        server sends whole states, not the changes between them."""
+        self.watchers.append(watcher)
+        return watcher
+
+    def place_bet(self, player: int, amount: int) -> int:
+        self.request(BET, struct.pack("<BI", player, amount))
+        return self.bets[player - 1]
+
+    def new_round(self) -> "RemoteRound":
+        self.request(DEAL)
+        return self.rnd
+
+    def close(self) -> None:
+        try:
+            self.request(CLOSE)
+        finally:
+            self.file.close()
+            self.sock.close()
+
+
+class RemoteRound:
+    """The round last reported for a ``RemoteTable``. Hands are slots of a
+    ``HandArena`` numbered in play order; the server settles the round, so
+    ``finish`` only returns the outcomes."""
+
+    def __init__(self, remote: RemoteTable):
+        self.remote = remote
+        self.dealer = Hand()
+        self.arena = HandArena(1)
+        self.slot = END
+        self.opts: list[str] = []
+        self.outcomes: list[Outcome] = []
+        self.shuffled = False
+        self.rebought: list[int] = []
+
+    @property
+    def active(self) -> bool:
+        return self.slot != END
+
+    @property
+    def current(self) -> Hand:
+        return self.arena.hand[self.slot]
+
+    def options(self) -> list[str]:
+        return list(self.opts)
+
+    def act(self, action: str) -> None:
+        self.remote.request(ACT, bytes([ACTIONS.index(action)]))
+
+    def hit(self) -> None:
+        self.act("hit")
+
+    def stand(self) -> None:
+        self.act("stand")
+
+    def split(self) -> None:
+        self.act("split")
+
+    def double_down(self) -> None:
+        self.act("double down")
+
+    def surrender(self) -> None:
+        self.act("surrender")
+
+    def finish(self) -> list[Outcome]:
+        return self.outcomes
+
+
+# ---------------------------------------------------------------------------#
+#                                   main                                     #
+# ---------------------------------------------------------------------------#
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Host blackjack tables over TCP or a Unix socket.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7000)
+    parser.add_argument("--unix", help="listen on this Unix socket path instead of TCP")
+    parser.add_argument("--max-tables", type=int, default=100_000)
+    add_rules_arguments(parser)
+    args = parser.parse_args(argv)
+
+    rules = rules_from_arguments(args)
+    server = TableServer(rules, args.max_tables)
+
+    async def run():
+        listener = await serve(server, args.host, args.port, args.unix)
+        where = args.unix or f"{args.host}:{args.port}"
+        print(f"serving {rules.key} tables on {where}")
+        async with listener:
+            await listener.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+# tests/test_bankroll.py
+import math
+from statistics import NormalDist
+
+import pytest
+
+from engine import BankrollStats
+
+
+def naive_risk(mu, var, b, n):
+    phi, sd_n = NormalDist().cdf, math.sqrt(var * n)
+    return phi((-b - mu * n) / sd_n) + math.exp(-2 * mu * b / var) * phi((-b + mu * n) / sd_n)
+
+
+@pytest.mark.parametrize("mu, b, n", [(0.02, 50, 2_000), (-0.02, 50, 2_000), (-0.05, 30, 500), (0.01, 200, 100_000)])
+def test_finite_horizon_matches_the_closed_form(mu, b, n):
+    assert BankrollStats(mu, 1.3, 1, b).risk_of_ruin(n) == pytest.approx(naive_risk(mu, 1.3, b, n), rel=1e-9)
+
+
+def test_negative_drift_does_not_overflow():
+    deep = BankrollStats(-0.05, 1.3, 1, 10_000)
+    assert deep.risk_of_ruin() == 1.0
+    assert deep.risk_of_ruin(1_000) < 1e-12  # losing 50 units on average is far from 10,000
+    assert deep.risk_of_ruin(1_000_000) == pytest.approx(1.0)
+    shallow = BankrollStats(-0.05, 1.3, 1, 10)
+    assert 0.99 < shallow.risk_of_ruin(10_000) <= 1.0
+    risks = [deep.risk_of_ruin(n) for n in (10_000, 100_000, 200_000, 300_000)]
+    assert risks == sorted(risks)
@@ -0,0 +1,30 @@
+# tests/test_batch.py
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from engine import Rules
+from engine.batch import settle_batch, settle_scalar, shuffled_shoes
+
+RULES = [Rules(), Rules(hit_soft_17=True), Rules(blackjack_payout=1.2)]
+
+
+@pytest.mark.parametrize("rules", RULES, ids=lambda r: f"{r.key}_bj{r.blackjack_payout}")
+@pytest.mark.parametrize("seed", range(5))
+def test_batch_matches_scalar(rules, seed):
+    """Random shoes, hit counts and double flags settle alike both ways."""
+    rng = np.random.default_rng(seed)
+    shoes = shuffled_shoes(2_000, rules.num_decks, seed=seed, depth=24)
+    hits = rng.integers(0, 4, len(shoes))
+    doubled = (hits == 1) & (rng.random(len(shoes)) < 0.5)
+
+    payout, outcome = settle_batch(shoes, hits, doubled, rules)
+    want_payout, want_outcome = settle_scalar(shoes, hits, doubled, rules)
+    np.testing.assert_array_equal(outcome, want_outcome)
+    np.testing.assert_array_equal(payout, want_payout)
+
+
+def test_scalar_arguments_broadcast():
+    shoes = shuffled_shoes(500, seed=9, depth=20)
+    for got, want in zip(settle_batch(shoes, 1, True), settle_scalar(shoes, 1, True)):
+        np.testing.assert_array_equal(got, want)
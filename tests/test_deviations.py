@@ -0,0 +1,31 @@
+# tests/test_deviations.py
+import pytest
+
+from engine import HI_LO, ILLUSTRIOUS_18, KO, DeviationStrategy, Rules, playing_efficiency, simulate
+from engine.deviations import decision_effects
+
+STIFFS = ILLUSTRIOUS_18[:2]  # 16 and 15 against a ten
+
+
+def test_small_cards_out_favour_standing_on_a_stiff():
+    effects = decision_effects(ILLUSTRIOUS_18[0])  # 16 v 10: stand instead of hit
+    assert effects[3] > 0 > effects[8]  # a 5 out helps standing, a ten out hurts it
+
+
+def test_nine_doubles_need_the_rules_to_allow_them():
+    nine_v_two = ILLUSTRIOUS_18[8]
+    assert decision_effects(nine_v_two) is None
+    assert decision_effects(nine_v_two, Rules(double_totals=(9, 10, 11))) is not None
+
+
+def test_counts_track_stiff_decisions():
+    assert playing_efficiency(HI_LO, STIFFS) > 0.6
+    assert playing_efficiency(KO, STIFFS) > 0.6
+
+
+def test_fallback_follows_the_rules():
+    assert simulate(None, DeviationStrategy(), 2_000, seed=1).hands
+    rules = Rules(surrender=True)
+    assert DeviationStrategy(rules).fallback.rules is rules
+    with pytest.raises(FileNotFoundError, match="--surrender"):  # its table, not the default one
+        simulate(rules, DeviationStrategy(rules), 2_000, seed=1)
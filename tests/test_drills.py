@@ -0,0 +1,58 @@
+# tests/test_drills.py
+import pytest
+
+from engine import Rules
+from engine.drills import (
+    HANDS,
+    SCENARIOS,
+    TRUE_COUNTS,
+    UPCARDS,
+    DrillPool,
+    DrillStats,
+    Scenario,
+    count_composition,
+    deal_probability,
+    scenario_index,
+)
+
+PER_HAND = len(UPCARDS) * len(TRUE_COUNTS)
+TENS = Scenario.at(scenario_index(HANDS.index((10, 10, True)), 6, 0))
+HARD_20 = Scenario.at(scenario_index(HANDS.index((10, 10, False)), 6, 0))
+
+
+def test_pairs_are_shown_as_one_rank():
+    pool = DrillPool(seed=1)
+    for _ in range(200):
+        hand, _ = pool.cards(TENS)
+        assert hand.is_pair
+        assert len({card // 4 for card in hand}) == 1
+
+
+def test_hard_20_is_two_ranks_and_never_splits():
+    pool = DrillPool(seed=1)
+    assert HARD_20.kind == "hard" and TENS.kind == "pair"
+    assert "split" not in pool.options(HARD_20) and "split" in pool.options(TENS)
+    for _ in range(200):
+        hand, _ = pool.cards(HARD_20)
+        assert hand.total == 20 and not hand.is_pair
+
+
+def test_ten_pairs_are_weighted_by_same_rank_combinations():
+    comp = count_composition(0, 2)
+    pair, hard = (deal_probability(10, 10, 6, comp, pair) for pair in (True, False))
+    assert pair / hard == pytest.approx((32 / 4 - 1) / (32 * 3 / 4))
+    assert pair + hard == pytest.approx(32 / 104 * 31 / 103 * 8 / 102)
+
+
+def test_stats_from_before_hard_20_still_load(tmp_path):
+    path = tmp_path / "stats.bin"
+    stats = DrillStats()
+    stats.attempts[0] = 3
+    n = SCENARIOS - PER_HAND
+    path.write_bytes(b"".join(col[:n].tobytes() for col in (stats.attempts, stats.correct, stats.loss)))
+    assert DrillStats(str(path)).summary() == (3, 0, 0.0)
+
+
+def test_missing_table_names_its_generator():
+    with pytest.raises(FileNotFoundError, match=r"python -m engine\.drills --decks 3"):
+        DrillPool(Rules(num_decks=3))
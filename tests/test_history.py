@@ -0,0 +1,39 @@
+# tests/test_history.py
+import pytest
+
+from engine import HistoryLog, HistoryWriter, Shoe, Table, recommend
+from engine.history import replay
+
+
+def log_and_replay(path, shoe, rounds=50):
+    """Play ``rounds`` logged rounds from ``shoe``; the rounds whose replay differs."""
+    with HistoryWriter(str(path)) as writer:
+        table = Table(2, shoe=shoe, history=writer, starting_chips=1 << 20)
+        for _ in range(rounds):
+            rnd = table.new_round()
+            while rnd.active:
+                rnd.act(recommend(rnd.current, rnd.dealer[0], table.rules, rnd.options()))
+            rnd.finish()
+    bad = []
+    with HistoryLog(str(path)) as log:
+        for n in range(rounds):
+            records = log.round(n)
+            rnd = replay(records)
+            if [rnd.dealer.cards, *(rnd.arena.hand[s].cards for s in rnd.arena.order())] != [r.codes for r in records]:
+                bad.append(n)
+    return bad
+
+
+def test_replay_deals_the_logged_cards(tmp_path):
+    assert log_and_replay(tmp_path / "h.bin", Shoe(seed=11)) == []
+
+
+def test_replay_of_a_batch_shoe(tmp_path):
+    pytest.importorskip("numpy")
+    assert log_and_replay(tmp_path / "h.bin", Shoe(seed=11, batch=8)) == []
+
+
+def test_negative_seed_is_logged_and_replayed(tmp_path):
+    shoe = Shoe(seed=-1)
+    assert shoe.seed == 2**64 - 1
+    assert log_and_replay(tmp_path / "h.bin", shoe, rounds=5) == []
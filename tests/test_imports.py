@@ -0,0 +1,21 @@
+# tests/test_imports.py
+import os
+import subprocess
+import sys
+
+import engine
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_import_leaves_heavy_modules_alone():
+    code = "import sys, engine; print(sorted(m for m in ('concurrent.futures', 'multiprocessing', 'statistics', 'engine.drills') if m in sys.modules))"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, cwd=ROOT).stdout
+    assert out.strip() == "[]"
+
+
+def test_lazy_names_resolve():
+    from engine.history import HistoryLog
+
+    assert engine.HistoryLog is HistoryLog
+    assert "simulate_parallel" in dir(engine)
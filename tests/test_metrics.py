@@ -0,0 +1,23 @@
+# tests/test_metrics.py
+import pytest
+
+import textblackjack
+from engine import Metrics, Table
+
+
+def test_sample_must_be_positive():
+    with pytest.raises(ValueError, match="sample must be at least 1"):
+        Metrics(sample=0)
+    with pytest.raises(SystemExit):
+        textblackjack.main(["--auto", "1", "--metrics", "unused.prom", "--sample", "0"])
+
+
+def test_one_round_in_sample_is_instrumented():
+    metrics = Metrics(sample=3)
+    table = Table(metrics=metrics)
+    for _ in range(7):
+        rnd = table.new_round()
+        while rnd.active:
+            rnd.stand()
+        rnd.finish()
+    assert (metrics.rounds, metrics.sampled_rounds) == (7, 3)
@@ -0,0 +1,8 @@
+# tests/test_parallel.py
+from engine import simulate_parallel
+
+
+def test_result_does_not_depend_on_workers():
+    serial = simulate_parallel(n_hands=4_000, seed=7, workers=1, chunk=500)
+    pooled = simulate_parallel(n_hands=4_000, seed=7, workers=3, chunk=500)
+    assert pooled == serial  # bit-for-bit, float sums included
@@ -0,0 +1,19 @@
+# tests/test_rules.py
+from engine import Rules
+
+
+def test_key_defaults():
+    assert Rules().key == "2d_s17"
+
+
+def test_key_separates_rules_that_change_strategy():
+    variants = [
+        Rules(),
+        Rules(hit_soft_17=True),
+        Rules(double_after_split=False),
+        Rules(double_totals=(9, 10, 11)),
+        Rules(surrender=True),
+        Rules(hit_split_aces=False),
+        Rules(num_decks=6),
+    ]
+    assert len({r.key for r in variants}) == len(variants)
@@ -0,0 +1,24 @@
+# tests/test_strategy.py
+import pytest
+
+from engine import DEFAULT_RULES, Hand, Rules, card_code, recommend
+from engine.strategy import load_table
+
+
+def test_missing_table_names_its_generator():
+    rules = Rules(num_decks=3, hit_soft_17=True, surrender=True)
+    with pytest.raises(FileNotFoundError, match=r"python -m engine\.strategy --decks 3 --h17 --surrender"):
+        recommend(Hand([card_code("CT"), card_code("H6")]), card_code("SA"), rules)
+
+
+def test_table_is_kept_on_the_rule_config():
+    table = load_table(DEFAULT_RULES)
+    assert DEFAULT_RULES.config.strategy is table
+    assert recommend(Hand([card_code("CT"), card_code("H6")]), card_code("ST")) == "hit"
+    assert recommend(Hand([card_code("CT"), card_code("H7")]), card_code("ST")) == "stand"
+
+
+def test_surrender_needs_surrender_rules():
+    hand = Hand([card_code("CT"), card_code("H6")])
+    with pytest.raises(ValueError, match="rules 2d_s17 have no surrender table"):
+        recommend(hand, card_code("SA"), options=["hit", "stand", "double down", "surrender"])
@@ -0,0 +1,47 @@
+# tests/test_table.py
+import pytest
+
+from engine import ACE_CODES, Metrics, Rules, Shoe, Table, recommend
+from engine.arena import SPLIT
+
+
+def test_act_plays_options_by_name():
+    metrics = Metrics()
+    table = Table(3, shoe=Shoe(seed=3), metrics=metrics, starting_chips=1 << 20)
+    played = []
+    for _ in range(200):
+        rnd = table.new_round()
+        while rnd.active:
+            action = recommend(rnd.current, rnd.dealer[0], table.rules, rnd.options())
+            rnd.act(action)
+            played.append(action.replace(" ", "_"))
+        rnd.finish()
+    assert {"hit", "stand", "double_down", "split"} <= set(played)
+    assert all(metrics.counters.get(name) == played.count(name) for name in set(played))
+
+
+def test_act_rejects_unknown_names():
+    rnd = Table(shoe=Shoe(seed=1)).new_round()
+    with pytest.raises(ValueError, match="'insure' is not an action"):
+        rnd.act("insure")
+
+
+def split_ace_options(rules, rounds=3_000):
+    """Options offered on split aces, splitting whenever allowed."""
+    table = Table(shoe=Shoe(seed=5), rules=rules, starting_chips=1 << 30)
+    seen = set()
+    for _ in range(rounds):
+        rnd = table.new_round()
+        while rnd.active:
+            s, opts = rnd.slot, rnd.options()
+            if rnd.arena.flags[s] & SPLIT and rnd.current[0] in ACE_CODES:
+                seen.add(tuple(opts))
+            rnd.act("split" if "split" in opts else "stand")
+        rnd.finish()
+    return seen
+
+
+def test_split_aces_resplit_without_hits():
+    assert split_ace_options(Rules(hit_split_aces=False)) == {("stand", "split")}
+    assert split_ace_options(Rules(hit_split_aces=False, resplit_aces=False)) == set()
+    assert ("hit", "stand", "split") in split_ace_options(Rules())
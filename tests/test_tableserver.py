@@ -0,0 +1,31 @@
+# tests/test_tableserver.py
+import struct
+
+import pytest
+
+from tableserver import DEAL, OPEN, R_ERROR, R_STATE, STATE, TABLE_BYTES, TableServer, TableSession, main, table_bytes
+
+
+def test_hosted_table_fits_memory_budget():
+    assert table_bytes(2_000) <= TABLE_BYTES
+
+
+def test_internal_error_is_reported_and_the_table_kept(monkeypatch, capsys):
+    server = TableServer()
+    _, table_id, _ = server.handle(OPEN, 0, struct.pack("<BQ", 1, 1))
+
+    def broken(session):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(TableSession, "deal", broken)
+    reply, _, body = server.handle(DEAL, table_id, b"")
+    assert reply == R_ERROR and b"boom" in body
+    assert "RuntimeError" in capsys.readouterr().err
+    assert server.handle(STATE, table_id, b"")[0] == R_STATE
+
+
+def test_server_takes_every_rule_option(capsys):
+    with pytest.raises(SystemExit):
+        main(["--help"])
+    usage = capsys.readouterr().out
+    assert all(flag in usage for flag in ("--decks", "--h17", "--no-das", "--double", "--surrender", "--no-hit-split-aces"))
@@ -1,263 +1,395 @@
 # textblackjack.py
-import copy
-import random
-import math
-import pygame  # only for image-preload; CLI itself doesn’t use Pygame
+import argparse
+import sys
+
+from engine.arena import BLACKJACK_HAND
+from engine import HistoryWriter, Metrics, Outcome, Rules, Shoe, Table, rank_name, recommend
+from engine.drills import FOCUS, DrillPool, DrillStats, stats_path
+from engine.strategy import load_table
+
+# --- constants ---------------------------------------------------------------
+RULES = Rules()  # e.g. Rules(hit_soft_17=True, blackjack_payout=1.2, surrender=True)
+FLUSH_LINES = 4096  # buffered output is written in blocks of this many lines
+OUTCOME_TEXT = {
+    Outcome.PUSH: "Push. Keep Bet.",
+    Outcome.WIN: "Player Win, Win Bet.",
+    Outcome.LOSE: "Dealer Win, Lose Bet.",
+    Outcome.BLACKJACK: f"Blackjack, Win {RULES.blackjack_payout:g}x Bet.",
+    Outcome.BLACKJACK_PUSH: "Blackjack Push. Keep Bet.",
+    Outcome.BUST: "Player Bust, Lose Bet.",
+    Outcome.DEALER_BUST: "Dealer Bust, Win Bet.",
+    Outcome.DEALER_BLACKJACK: "Dealer Blackjack, Lose Bet.",
+    Outcome.SURRENDER: "Surrendered, Lose Half Bet.",
+}
 
-# --- constants & card data --------------------------------------------------
-MIN_BET = 5
-RANKS = ["2", "3", "4", "5", "6", "7", "8", "9", "T", "J", "Q", "K", "A"]
-COUNT_VALUES = dict(zip(RANKS, [1] * 5 + [0] * 3 + [-1] * 5))
-CARD_VALUES = dict(zip(RANKS, [2, 3, 4, 5, 6, 7, 8, 9, 10, 10, 10, 10, 11]))
-CARDS = [s + r for r in RANKS for s in ("C", "D", "H", "S")]
 
-# preload images so the deck structure matches the GUI build; unused here
-card_images = {c: pygame.image.load(f"images/{c}.png").convert() for c in CARDS}
+# ---------------------------------------------------------------------------#
+#                                 rendering                                  #
+# ---------------------------------------------------------------------------#
+def hand_text(cards_on_table, name: str) -> str:
+    return f"{name}'s Hand: " + " | ".join(rank_name(card) for card in cards_on_table)
+
+
+def hand_label(rnd, slot: int) -> str:
+    """"Player 2", or "Player 2 Split 1" once the player has split."""
+    arena = rnd.arena
+    p_num = arena.player[slot]
+    if rnd.hand_counts[p_num - 1] == 1:
+        return f"Player {p_num}"
+    owned = [s for s in arena.order() if arena.player[s] == p_num]
+    return f"Player {p_num} Split {owned.index(slot) + 1}"
+
+
+class TextView:
+    """Renders game events as the classic transcript.
+
+    Lines are collected in a buffer and written to ``stream`` every
+    ``flush_lines`` lines, and whenever the player is about to be prompted.
+    """
+
+    def __init__(self, stream=None, flush_lines: int = 1):
+        self.stream = stream if stream is not None else sys.stdout
+        self.flush_lines = flush_lines
+        self.lines: list[str] = []
+
+    def line(self, text: str = "") -> None:
+        self.lines.append(text)
+        if len(self.lines) >= self.flush_lines:
+            self.flush()
+
+    def flush(self) -> None:
+        if self.lines:
+            self.stream.write("\n".join(self.lines) + "\n")
+            self.lines.clear()
+        self.stream.flush()
+
+    # ----- game events ------------------------------------------------------
+    def shuffled(self) -> None:
+        self.line("Deck shuffled!")
+
+    def rebought(self, player: int, amount: int) -> None:
+        self.line(f"Player {player} rebought for ${amount}!")
+
+    def dealt(self, rnd) -> None:
+        self.line(f"Dealer's Hand: {rank_name(rnd.dealer[0])} | ?")
+        for p in range(1, rnd.table.num_players + 1):
+            self.line(hand_text(rnd.arena.hand[p - 1], f"Player {p}"))
+        self.line()
+        if rnd.dealer_blackjack:
+            self.line("Dealer Blackjack!")
+            return
+        for p in range(1, rnd.table.num_players + 1):
+            if rnd.arena.status[p - 1] == BLACKJACK_HAND:
+                self.line(f"Player {p} Blackjack!")
+
+    def turn(self, rnd, opts: list[str]) -> None:
+        self.line(f"Dealer's Hand: {rank_name(rnd.dealer[0])} | ?")
+        self.line(hand_text(rnd.current, hand_label(rnd, rnd.slot)))
+        self.line("Options: " + " | ".join(opts))
+        self.line(f"Basic strategy: {recommend(rnd.current, rnd.dealer[0], RULES, opts)}")
+
+    def acted(self, rnd, slot: int, choice: str) -> None:
+        if choice == "split":
+            return
+        hand = rnd.arena.hand[slot]
+        if choice == "double down" or (choice == "hit" and hand.total > 21):
+            self.line(hand_text(hand, hand_label(rnd, slot)))
+            if choice == "hit":
+                self.line("Bust!")
+            self.line()
+        elif choice != "hit":
+            self.line()
+
+    def settled(self, rnd, dealer_cards: int) -> None:
+        dealer, arena = rnd.dealer, rnd.arena
+        if not rnd.dealer_blackjack:
+            self.line(hand_text(dealer[:dealer_cards], "Dealer"))
+        for n in range(dealer_cards + 1, len(dealer) + 1):
+            self.line("Dealer Hit")
+            self.line(hand_text(dealer[:n], "Dealer"))
+        if not rnd.dealer_blackjack:
+            self.line("Dealer Bust!" if dealer.total > 21 else "Dealer Stand")
+            self.line()
+
+        order = arena.order()
+        for s in order:
+            self.line(f"{hand_label(rnd, s)}: {OUTCOME_TEXT[arena.outcome[s]]}")
+
+        self.line("\nCollecting Hands ... ")
+        self.line(hand_text(dealer, "Dealer"))
+        for s in order:
+            self.line(hand_text(arena.hand[s], hand_label(rnd, s)))
+
+    def count(self, shoe) -> None:
+        self.line(f"{shoe.running_count} (true count {shoe.true_count:+.1f})")
+
+    # ----- drills -----------------------------------------------------------
+    def drill(self, n: int, scenario, hand, upcard: int, opts: list[str]) -> None:
+        self.line(f"Drill {n}: true count {scenario.true_count:+d}")
+        self.line(f"Dealer's Hand: {rank_name(upcard)} | ?")
+        self.line(hand_text(hand, "Player"))
+        self.line("Options: " + " | ".join(opts))
+
+    def graded(self, grade, evs: dict[str, float]) -> None:
+        if grade.correct:
+            self.line(f"Correct! {grade.best} (EV {evs[grade.best]:+.3f})")
+        else:
+            self.line(
+                f"Wrong: {grade.best} (EV {evs[grade.best]:+.3f}) beats {grade.action} "
+                f"(EV {evs[grade.action]:+.3f}), {grade.loss:.3f} bets lost"
+            )
+        self.line()
 
-deck = copy.deepcopy(CARDS * 2)
-NUM_CARDS = len(deck)
+    def drill_summary(self, stats) -> None:
+        attempts, correct, loss = stats.summary()
+        if attempts:
+            self.line(f"Drills: {correct}/{attempts} correct ({correct / attempts:.0%}), {loss:.3f} bets lost")
+        for kind, (attempts, correct, loss) in stats.by_kind().items():
+            if attempts:
+                self.line(f"{kind:5}: {correct}/{attempts} correct ({correct / attempts:.0%}), {loss:.3f} bets lost")
 
-cut = curr = running_count = 0
-bet_amounts: list[int] = []
-chip_stacks: list[int] = []
-hand: list = []
-flat_hands: list[str] = []
-is_split: list[bool] = []
-is_double_down: list[bool] = []
 
+class QuietView(TextView):
+    """A view that renders nothing, so replays skip all formatting."""
 
-# ---------------------------------------------------------------------------#
-#                                 helpers                                    #
-# ---------------------------------------------------------------------------#
-def shuffle() -> None:
-    global cut, curr
-    cut = random.randrange(NUM_CARDS // 3, NUM_CARDS * 2 // 3)
-    curr = 0
-    random.shuffle(deck)
-    print("Deck shuffled!")
-
-
-def calc_total(cards_on_table) -> int:
-    total = aces = 0
-    for card in cards_on_table:
-        total += CARD_VALUES[card[1]]
-        if card[1] == "A":
-            aces += 1
-    while aces and total > 21:
-        aces -= 1
-        total -= 10
-    return total
-
-
-def draw_card(target_hand, n: int = 1):
-    global curr
-    for _ in range(n):
-        target_hand.append(deck[curr])
-        curr += 1
-    return target_hand
-
-
-def is_blackjack(cards_on_table) -> bool:
-    return len(cards_on_table) == 2 and calc_total(cards_on_table) == 21
-
-
-def print_hand(cards_on_table, name: str) -> None:
-    if isinstance(cards_on_table[0], list):
-        for idx, sub in enumerate(cards_on_table):
-            print_hand(sub, f"{name} Split {idx + 1}")
-    else:
-        print(f"{name}'s Hand: ", end="")
-        for i, card in enumerate(cards_on_table):
-            sep = "\n" if i == len(cards_on_table) - 1 else " | "
-            print(card[1], end=sep)
+    def line(self, text: str = "") -> None:
+        pass
 
+    def shuffled(self) -> None:
+        pass
 
-def print_dealer() -> None:
-    print(f"Dealer's Hand: {hand[0][0][1]} | ?")
+    def rebought(self, player: int, amount: int) -> None:
+        pass
 
+    def dealt(self, rnd) -> None:
+        pass
 
-def play_hand(cards_on_table, player_idx: int, label: str):
-    global bet_amounts, is_split, is_double_down
+    def turn(self, rnd, opts: list[str]) -> None:
+        pass
 
-    opts = ["hit", "stand"]
-    if len(cards_on_table) == 2 and cards_on_table[0][1] == cards_on_table[1][1]:
-        opts.append("split")
-    if calc_total(cards_on_table) in (10, 11) and len(cards_on_table) == 2:
-        opts.append("double down")
+    def acted(self, rnd, slot: int, choice: str) -> None:
+        pass
 
-    print_dealer()
-    print_hand(cards_on_table, label)
-    print("Options: " + " | ".join(opts))
+    def settled(self, rnd, dealer_cards: int) -> None:
+        pass
 
-    choice = input("What would you like to do? >> ").lower()
-    while choice not in opts:
-        choice = input("What would you like to do? >> ").lower()
+    def count(self, shoe) -> None:
+        pass
 
-    if choice == "hit":
-        cards_on_table = draw_card(cards_on_table)
-        if calc_total(cards_on_table) > 21:
-            print_hand(cards_on_table, label)
-            print("Bust!")
-        else:
-            cards_on_table = play_hand(cards_on_table, player_idx, label)
+    def drill(self, n: int, scenario, hand, upcard: int, opts: list[str]) -> None:
+        pass
 
-    elif choice == "split":
-        is_split[player_idx - 1] = True
-        cards_on_table = [[cards_on_table[0]], [cards_on_table[1]]]
-        cards_on_table[0] = draw_card(cards_on_table[0])
-        cards_on_table[1] = draw_card(cards_on_table[1])
-        cards_on_table[0] = play_hand(cards_on_table[0], player_idx, f"{label} Split 1")
-        cards_on_table[1] = play_hand(cards_on_table[1], player_idx, f"{label} Split 2")
+    def graded(self, grade, evs: dict[str, float]) -> None:
+        pass
 
-    elif choice == "double down":
-        is_double_down[player_idx - 1] = True
-        bet_amounts[player_idx - 1] *= 2
-        cards_on_table = draw_card(cards_on_table)
-        print_hand(cards_on_table, label)
 
-    # stand or after action
-    print("")
-    return cards_on_table
+# ---------------------------------------------------------------------------#
+#                              decision sources                              #
+# ---------------------------------------------------------------------------#
+# A decision source answers each prompt with the text a player would type.
+# ``kind`` is one of "players", "bet", "action", "count", "quit" or "drill";
+# action prompts also get the round and the legal options, drill prompts
+# just the options. Raising EOFError ends
+# the game.
+class Console:
+    """Asks a person at the terminal."""
 
+    def __init__(self, view: TextView):
+        self.view = view
 
-def compare_hand(player_cards, dealer_cards, idx: int) -> None:
-    global chip_stacks
-    player_total, dealer_total = calc_total(player_cards), calc_total(dealer_cards)
+    def ask(self, kind: str, prompt: str, rnd=None, opts=None) -> str:
+        self.view.flush()
+        return input(prompt)
 
-    print(f"Player {idx}: ", end="")
-    mult = 0
 
-    if is_blackjack(player_cards) and not is_split[idx - 1]:
-        if is_blackjack(dealer_cards):
-            print("Blackjack Push. Keep Bet.")
-        else:
-            mult = 1.5
-            print("Blackjack, Win 1.5x Bet.")
-    elif player_total > 21:
-        mult = -1
-        print("Player Bust, Lose Bet.")
-    else:
-        if dealer_total > 21:
-            mult = 1
-            print("Dealer Bust, Win Bet.")
-        else:
-            if player_total > dealer_total:
-                mult = 1
-                print("Player Win, Win Bet.")
-            elif player_total < dealer_total:
-                mult = -1
-                print("Dealer Win, Lose Bet.")
-            else:
-                print("Push. Keep Bet.")
+class DecisionFile:
+    """Replays answers recorded one per line, e.g. a saved stdin transcript."""
+
+    def __init__(self, path: str):
+        with open(path) as f:
+            self.answers = iter(f.read().splitlines())
 
-    chip_stacks[idx - 1] += bet_amounts[idx - 1] * mult
+    def ask(self, kind: str, prompt: str, rnd=None, opts=None) -> str:
+        try:
+            return next(self.answers)
+        except StopIteration:
+            raise EOFError(prompt) from None
 
 
-def flatten_hands(stack) -> None:
-    for item in stack:
-        flatten_hands(item) if isinstance(item, list) else flat_hands.append(item)
+class StrategyPlayer:
+    """Plays ``rounds`` rounds with ``strategy(hand, dealer_upcard, options)``
+    (basic strategy by default), keeping the default bet."""
+
+    def __init__(self, strategy=None, rounds: int = 1, num_players: int = 1):
+        self.strategy = strategy or (lambda hand, upcard, opts: recommend(hand, upcard, RULES, opts))
+        self.rounds = rounds
+        self.num_players = num_players
+        self.played = 0
+
+    def ask(self, kind: str, prompt: str, rnd=None, opts=None) -> str:
+        if kind == "action":
+            return self.strategy(rnd.current, rnd.dealer[0], opts)
+        if kind == "players":
+            return str(self.num_players)
+        if kind == "quit":
+            self.played += 1
+            return "y" if self.played >= self.rounds else "n"
+        return ""
 
 
 # ---------------------------------------------------------------------------#
 #                                main driver                                 #
 # ---------------------------------------------------------------------------#
-def blackjack() -> None:
-    global hand, bet_amounts, chip_stacks, is_split, is_double_down
-    global curr, cut, running_count
+def play_hand(rnd, source, view: TextView) -> None:
+    slot = rnd.slot
+    opts = rnd.options()
+    view.turn(rnd, opts)
+
+    choice = source.ask("action", "What would you like to do? >> ", rnd, opts).lower()
+    while choice not in opts:
+        choice = source.ask("action", "What would you like to do? >> ", rnd, opts).lower()
+    rnd.act(choice)
+    view.acted(rnd, slot, choice)
 
+
+def blackjack(source=None, view: TextView | None = None, seed=None, history=None, metrics=None) -> Table:
+    """Play until the source says quit (or runs out); returns the table.
+
+    With no arguments this is the interactive game. ``seed`` fixes the shoe
+    so a recorded decision file replays the same game; ``history`` (a
+    ``HistoryWriter``) logs every round and ``metrics`` (a ``Metrics``)
+    instruments them.
+    """
+    view = view if view is not None else TextView()
+    source = source if source is not None else Console(view)
     try:
-        num_players = int(input("Number of Players: "))
+        num_players = int(source.ask("players", "Number of Players: "))
     except ValueError:
         num_players = 1
 
-    bet_amounts = [MIN_BET] * num_players
-    chip_stacks = [100] * num_players
-    is_split = [False] * num_players
-    is_double_down = [False] * num_players
-
-    shuffle()
-
-    while True:
-        # auto-rebuy
-        for p in range(num_players):
-            if chip_stacks[p] < MIN_BET:
-                chip_stacks[p] += 100
-                print(f"Player {p + 1} rebought for $100!")
-
-        if curr >= cut:
-            shuffle()
-
-        for p in range(num_players):
-            try:
-                wager = int(
-                    input(
-                        f"Enter your bet, Player {p + 1} (chips {chip_stacks[p]}, default {bet_amounts[p]}): "
-                    )
-                )
-            except ValueError:
-                wager = bet_amounts[p]
-            if wager > chip_stacks[p] or wager < MIN_BET:
-                wager = MIN_BET
-            bet_amounts[p] = wager
-
-        # initial deal -------------------------------------------------------
-        hand = [[] for _ in range(num_players + 1)]  # 0 = dealer
-        for i in range(num_players + 1):
-            hand[i] = draw_card(hand[i], 2)
-
-        is_split = [False] * num_players
-        is_double_down = [False] * num_players
-
-        print_dealer()
-        for p in range(1, num_players + 1):
-            print_hand(hand[p], f"Player {p}")
-        print("")
-
-        if calc_total(hand[0]) == 21:
-            print("Dealer Blackjack!")
-        else:
+    shoe = Shoe(RULES.num_decks, penetration=RULES.penetration, seed=seed)
+    table = Table(num_players, shoe=shoe, rules=RULES, history=history, metrics=metrics)
+    table.shoe.shuffle()
+    view.shuffled()
+
+    try:
+        while True:
+            for p in table.rebuy():
+                view.rebought(p, table.rebuy_amount)
+
             for p in range(num_players):
-                if calc_total(hand[p + 1]) == 21:
-                    print("Player Blackjack!")
-                else:
-                    hand[p + 1] = play_hand(hand[p + 1], p + 1, f"Player {p + 1}")
-                    print_hand(hand[p + 1], f"Player {p + 1}")
-                    print("")
-            print_hand(hand[0], "Dealer")
-            while calc_total(hand[0]) < 17:
-                hand[0] = draw_card(hand[0])
-                print("Dealer Hit")
-                print_hand(hand[0], "Dealer")
-
-            if calc_total(hand[0]) > 21:
-                print("Dealer Bust!")
-            else:
-                print("Dealer Stand")
-            print("")
-
-        # settle bets -------------------------------------------------------
-        for p in range(1, num_players + 1):
-            target = hand[p]
-            if isinstance(target[0], list):
-                for sub in target:
-                    compare_hand(sub, hand[0], p)
-            else:
-                compare_hand(target, hand[0], p)
-
-        # count & continue ---------------------------------------------------
-        print("\nCollecting Hands ... ")
-        print_hand(hand[0], "Dealer")
-        for p in range(1, num_players + 1):
-            print_hand(hand[p], f"Player {p}")
-
-        flat_hands.clear()
-        flatten_hands(hand)
-        running_count += sum(COUNT_VALUES[c[1]] for c in flat_hands)
-
-        if input("Reveal the count? (y/n) >> ").lower().startswith("y"):
-            print(running_count)
-        if input("Would you like to quit? (y/n) >> ").lower().startswith("y"):
-            break
-
-
-blackjack()
\ No newline at end of file
+                prompt = f"Enter your bet, Player {p + 1} (chips {table.chips[p]}, default {table.bets[p]}): "
+                try:
+                    wager = int(source.ask("bet", prompt))
+                except ValueError:
+                    wager = table.bets[p]
+                table.place_bet(p + 1, wager)
+
+            rnd = table.new_round()
+            if rnd.shuffled:
+                view.shuffled()
+            view.dealt(rnd)
+            while rnd.active:
+                play_hand(rnd, source, view)
+
+            dealer_cards = len(rnd.dealer)
+            rnd.finish()
+            view.settled(rnd, dealer_cards)
+
+            if source.ask("count", "Reveal the count? (y/n) >> ").lower().startswith("y"):
+                view.count(table.shoe)
+            if source.ask("quit", "Would you like to quit? (y/n) >> ").lower().startswith("y"):
+                break
+    except EOFError:
+        pass
+    finally:
+        view.flush()
+    return table
+
+
+def drills(pool: DrillPool, source, view: TextView, n: int = 0) -> None:
+    """Serve ``n`` drills from ``pool`` (0: until the source runs out), grading
+    each answer; ``pool.stats``, if any, records them."""
+    done = 0
+    try:
+        while done < n or not n:
+            scenario = next(pool)
+            hand, upcard = pool.cards(scenario)
+            opts = pool.options(scenario)
+            view.drill(done + 1, scenario, hand, upcard, opts)
+            choice = source.ask("drill", "What would you like to do? >> ", None, opts).lower()
+            while choice not in opts:
+                choice = source.ask("drill", "What would you like to do? >> ", None, opts).lower()
+            view.graded(pool.grade(scenario, choice), pool.evs(scenario))
+            done += 1
+    except EOFError:
+        pass
+    finally:
+        if pool.stats is not None:
+            view.drill_summary(pool.stats)
+        view.flush()
+
+
+def positive_int(text: str) -> int:
+    n = int(text)
+    if n < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, not {n}")
+    return n
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Text blackjack.")
+    parser.add_argument("--decisions", help="replay answers from this file, one per line")
+    parser.add_argument("--auto", type=int, metavar="ROUNDS", help="play ROUNDS rounds with basic strategy")
+    parser.add_argument("--players", type=int, default=1, help="players for --auto (default 1)")
+    parser.add_argument("--seed", type=int, help="seed the shoe so a replay deals the same cards")
+    parser.add_argument("--quiet", action="store_true", help="print only the final chip counts")
+    parser.add_argument("--history", help="append every round to this binary hand-history log")
+    parser.add_argument("--metrics", help="write engine counters and phase timings here (Prometheus text)")
+    parser.add_argument("--sample", type=positive_int, default=1, help="with --metrics, instrument one round in SAMPLE")
+    parser.add_argument("--drill", type=int, metavar="N", help="practise N graded decisions instead (0: until EOF)")
+    parser.add_argument("--focus", choices=FOCUS, default="frequency", help="which drills come up most (default frequency)")
+    parser.add_argument("--no-count", action="store_true", help="drill basic strategy only (true count 0)")
+    parser.add_argument("--drill-stats", default=stats_path(RULES), help="per-drill accuracy file (default %(default)s)")
+    args = parser.parse_args(argv)
+    try:
+        load_table(RULES)  # a missing strategy table fails here, not at the first tip
+    except FileNotFoundError as e:
+        parser.error(str(e))
+
+    if args.drill is not None:
+        view = TextView(flush_lines=1)
+        source = DecisionFile(args.decisions) if args.decisions else Console(view)
+        stats = DrillStats(args.drill_stats)
+        try:
+            pool = DrillPool(RULES, args.focus, not args.no_count, stats, seed=args.seed)
+        except (ValueError, FileNotFoundError) as e:  # e.g. --focus deviations with --no-count
+            parser.error(str(e))
+        with stats:
+            drills(pool, source, view, args.drill)
+        return
+
+    interactive = not (args.decisions or args.auto)
+    view = QuietView() if args.quiet else TextView(flush_lines=1 if interactive else FLUSH_LINES)
+    if args.decisions:
+        source = DecisionFile(args.decisions)
+    elif args.auto:
+        source = StrategyPlayer(rounds=args.auto, num_players=args.players)
+    else:
+        source = Console(view)
+    history = HistoryWriter(args.history) if args.history else None
+    metrics = Metrics(args.sample) if args.metrics else None
+    try:
+        table = blackjack(source, view, args.seed, history, metrics)
+    finally:
+        if history is not None:
+            history.close()
+        if metrics is not None:
+            with open(args.metrics, "w") as f:
+                f.write(metrics.prometheus())
+    if args.quiet:
+        print("chips:", " ".join(str(c) for c in table.chips))
+
+
+if __name__ == "__main__":
+    main()